@@ -1,14 +1,107 @@
+import asyncio
+import email.utils
+import functools
+import math
+import sys
+import time
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Literal, Optional
+from typing import Any, Literal, Optional
 
 import httpx
+import tenacity
 
-from lutraai.augmented_request_client import AugmentedTransport
+from lutraai.augmented_request_client import AsyncAugmentedTransport, AugmentedTransport
 from lutraai.decorator import purpose
 
+# The longest we will wait inside an action for a GitHub rate limit to reset.  Primary
+# rate limits can take up to an hour to reset, which is better reported than waited out.
+_MAX_RATE_LIMIT_WAIT_SECONDS = 60.0
 
-@dataclass
+# How long to wait before the first retry of a rate-limited response that does not say
+# when the rate limit resets.  The wait doubles with each further attempt.
+_MIN_RATE_LIMIT_WAIT_SECONDS = 1.0
+
+
+def _rate_limit_wait_seconds(
+    response: httpx.Response, attempt_number: int = 1
+) -> Optional[float]:
+    """
+    Returns how long to wait before retrying a rate-limited response, or None if the
+    response is not rate-limited.  `attempt_number` is the number of attempts made so
+    far, which is used to back off when the response does not say how long to wait.
+
+    See https://docs.github.com/en/rest/using-the-rest-api/rate-limits-for-the-rest-api#exceeding-the-rate-limit
+    """
+    if response.status_code not in (
+        httpx.codes.FORBIDDEN,
+        httpx.codes.TOO_MANY_REQUESTS,
+    ):
+        return None
+    if (retry_after := response.headers.get("retry-after")) is not None:
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            pass
+        try:
+            # Retry-After can also be an HTTP date.
+            retry_at = email.utils.parsedate_to_datetime(retry_after)
+            return max(retry_at.timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            # Neither; fall back to the other headers.
+            pass
+    if response.headers.get("x-ratelimit-remaining") == "0":
+        if (reset := response.headers.get("x-ratelimit-reset")) is not None:
+            return max(float(reset) - time.time(), 0.0)
+        # Without a reset time, back off rather than using up the attempts at once.
+        return _MIN_RATE_LIMIT_WAIT_SECONDS * 2 ** (attempt_number - 1)
+    if response.status_code == httpx.codes.TOO_MANY_REQUESTS or retry_after is not None:
+        # > Otherwise, wait for at least one minute before retrying.
+        return 60.0
+    # Forbidden for some other reason, e.g. missing permissions.
+    return None
+
+
+def _should_retry(response: httpx.Response) -> bool:
+    wait = _rate_limit_wait_seconds(response)
+    return wait is not None and wait <= _MAX_RATE_LIMIT_WAIT_SECONDS
+
+
+_retry_on_rate_limit = tenacity.retry(
+    retry=tenacity.retry_if_result(_should_retry),
+    wait=lambda retry_state: _rate_limit_wait_seconds(
+        retry_state.outcome.result(), retry_state.attempt_number
+    ),
+    stop=tenacity.stop_after_attempt(3),
+    # Give up by returning the last response, so that it is reported by
+    # `_raise_for_status`.
+    retry_error_callback=lambda retry_state: retry_state.outcome.result(),
+)
+
+
+@_retry_on_rate_limit
+def _maybe_retry_send(client: httpx.Client, request: httpx.Request) -> httpx.Response:
+    """Send a request using the client, retrying if rate-limited."""
+    return client.send(request)
+
+
+@_retry_on_rate_limit
+async def _maybe_retry_send_async(
+    client: httpx.AsyncClient, request: httpx.Request
+) -> httpx.Response:
+    """Send a request using the client, retrying if rate-limited."""
+    return await client.send(request)
+
+
+def _raise_for_status(response: httpx.Response) -> httpx.Response:
+    if (wait := _rate_limit_wait_seconds(response)) is not None:
+        raise RuntimeError(
+            f"GitHub rate limit exceeded; try again in {math.ceil(wait)} seconds"
+        )
+    return response.raise_for_status()
+
+
+@dataclass(slots=True)
 class GitHubPullRequest:
     id: int
     html_url: str
@@ -24,6 +117,57 @@ class GitHubPullRequest:
     user_login: str
 
 
+@functools.lru_cache(maxsize=1024)
+def _parse_datetime(value: str) -> datetime:
+    # GitHub timestamps have one-second resolution and recur a lot, e.g. a merged pull
+    # request's `updated_at`, `closed_at`, and `merged_at` are often identical, so
+    # avoid parsing the same string over and over.
+    return datetime.fromisoformat(value)
+
+
+def _parse_optional_datetime(value: Optional[str]) -> Optional[datetime]:
+    # GitHub sends `null` for unset timestamps, e.g. `merged_at` of an unmerged pull
+    # request.
+    return _parse_datetime(value) if value else None
+
+
+def _parse_pull_request(obj: dict[str, Any]) -> GitHubPullRequest:
+    user = obj["user"]
+    return GitHubPullRequest(
+        id=obj["id"],
+        html_url=obj["html_url"],
+        created_at=_parse_datetime(obj["created_at"]),
+        updated_at=_parse_datetime(obj["updated_at"]),
+        merged_at=_parse_optional_datetime(obj.get("merged_at")),
+        closed_at=_parse_optional_datetime(obj.get("closed_at")),
+        title=obj["title"],
+        # Logins and states repeat heavily across a listing, so share one copy of each.
+        state=sys.intern(obj["state"]),
+        draft=obj["draft"],
+        body=obj.get("body") or "",
+        user_id=user["id"],
+        user_login=sys.intern(user["login"]),
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def _pulls_url(owner: str, repo: str) -> httpx.URL:
+    return httpx.URL(f"https://api.github.com/repos/{owner}/{repo}/pulls")
+
+
+@functools.lru_cache(maxsize=64)
+def _pulls_params(
+    state: str, sort: str, sort_direction: str, per_page: int
+) -> tuple[tuple[str, str | int], ...]:
+    """Query parameters of a `pulls` API call, other than the page."""
+    return (
+        ("state", state),
+        ("per_page", per_page),
+        ("sort", sort),
+        ("direction", sort_direction),
+    )
+
+
 @purpose("Get pull requests.")
 def github_pulls(
     owner: str,
@@ -32,13 +176,14 @@ def github_pulls(
     sort: Literal["created", "updated", "popularity", "long-running"] = "created",
     sort_direction: Literal["asc", "desc"] = "desc",
     page: int = 1,
+    per_page: int = 100,
 ) -> list[GitHubPullRequest]:
     """
     Returns results of a GitHub `pulls` API call.
 
     Returns a paginated listing of pull requests in the given `repo` owned by `owner`.
-    Each page has at most 30 results.  To get more results, increment the `page` and
-    call this function again.
+    Each page has at most `per_page` results.  To get more results, increment the
+    `page` and call this function again.
 
     Parameters:
         owner: the owner of the repository.
@@ -46,53 +191,85 @@ def github_pulls(
         state: the state of the pull requests to fetch from GitHub.
         sort: by what to sort results.
         sort_direction: the direction of the sort.
-        page: the page of results to return. Each page has at most 30 results.
+        page: the page of results to return.
+        per_page: the maximum number of results per page. At most 100.
 
     """
     with httpx.Client(
         transport=AugmentedTransport(actions_v0.authenticated_request_github),
     ) as client:
-        response_json = (
-            client.get(
-                f"https://api.github.com/repos/{owner}/{repo}/pulls",
-                params={
-                    "state": state,
-                    "page": page,
-                    "sort": sort,
-                    "direction": sort_direction,
-                },
+        response_json = _raise_for_status(
+            _maybe_retry_send(
+                client,
+                client.build_request(
+                    "GET",
+                    _pulls_url(owner, repo),
+                    params=[
+                        *_pulls_params(state, sort, sort_direction, per_page),
+                        ("page", page),
+                    ],
+                ),
             )
-            .raise_for_status()
-            .json()
-        )
-    pull_requests = [
-        GitHubPullRequest(
-            id=obj["id"],
-            html_url=obj["html_url"],
-            created_at=datetime.fromisoformat(obj["created_at"]),
-            updated_at=datetime.fromisoformat(obj["updated_at"]),
-            merged_at=(
-                datetime.fromisoformat(obj["merged_at"])
-                if obj.get("merged_at")
-                else None
-            ),
-            closed_at=(
-                datetime.fromisoformat(obj["closed_at"])
-                if obj.get("closed_at")
-                else None
-            ),
-            title=obj["title"],
-            state=obj["state"],
-            draft=obj["draft"],
-            body=obj.get("body") or "",
-            user_id=obj["user"]["id"],
-            user_login=obj["user"]["login"],
-        )
-        for obj in response_json
-    ]
+        ).json()
+    pull_requests = [_parse_pull_request(obj) for obj in response_json]
     return pull_requests
 
 
+# Cap on the number of page requests `github_pulls_pages` has in flight at once, to
+# stay clear of GitHub's secondary rate limits.
+_MAX_CONCURRENT_PAGE_REQUESTS = 8
+
+
+@purpose("Get several pages of pull requests at once.")
+async def github_pulls_pages(
+    owner: str,
+    repo: str,
+    pages: list[int],
+    state: Literal["open", "closed", "all"] = "open",
+    sort: Literal["created", "updated", "popularity", "long-running"] = "created",
+    sort_direction: Literal["asc", "desc"] = "desc",
+    per_page: int = 100,
+) -> list[GitHubPullRequest]:
+    """
+    Returns the combined results of GitHub `pulls` API calls for several pages.
+
+    This is like `github_pulls`, but fetches all of the given `pages` concurrently,
+    which is much faster than calling `github_pulls` once per page.  The results
+    are returned in the order of `pages`.  Pages past the last page of results
+    contribute no pull requests.
+
+    Parameters:
+        owner: the owner of the repository.
+        repo: the repository name.
+        pages: the pages of results to return, e.g. [1, 2, 3].
+        state: the state of the pull requests to fetch from GitHub.
+        sort: by what to sort results.
+        sort_direction: the direction of the sort.
+        per_page: the maximum number of results per page. At most 100.
+    """
+    url = _pulls_url(owner, repo)
+    base_params = _pulls_params(state, sort, sort_direction, per_page)
+    # `httpx.Limits` has no effect with a custom transport, so limit concurrency here.
+    semaphore = asyncio.Semaphore(_MAX_CONCURRENT_PAGE_REQUESTS)
+
+    async def fetch_page(client: httpx.AsyncClient, page: int) -> httpx.Response:
+        async with semaphore:
+            return await _maybe_retry_send_async(
+                client,
+                client.build_request("GET", url, params=[*base_params, ("page", page)]),
+            )
+
+    async with httpx.AsyncClient(
+        transport=AsyncAugmentedTransport(actions_v0.authenticated_request_github),
+    ) as client:
+        responses = await asyncio.gather(*(fetch_page(client, page) for page in pages))
+    return [
+        _parse_pull_request(obj)
+        for response in responses
+        for obj in _raise_for_status(response).json()
+    ]
+
+
 @dataclass
 class GitHubIssue:
     id: int
@@ -141,32 +318,30 @@ def github_issues(
     with httpx.Client(
         transport=AugmentedTransport(actions_v0.authenticated_request_github)
     ) as client:
-        response_json = (
-            client.get(
-                f"https://api.github.com/repos/{owner}/{repo}/issues",
-                params={
-                    "state": state,
-                    "page": page,
-                    "sort": sort,
-                    "direction": sort_direction,
-                },
+        response_json = _raise_for_status(
+            _maybe_retry_send(
+                client,
+                client.build_request(
+                    "GET",
+                    f"https://api.github.com/repos/{owner}/{repo}/issues",
+                    params={
+                        "state": state,
+                        "page": page,
+                        "sort": sort,
+                        "direction": sort_direction,
+                    },
+                ),
             )
-            .raise_for_status()
-            .json()
-        )
+        ).json()
     issues = [
         GitHubIssue(
             id=obj["id"],
             html_url=obj["html_url"],
             issue_number=obj["number"],
             issue_type="pull_request" if "pull_request" in obj else "issue",
-            created_at=datetime.fromisoformat(obj["created_at"]),
-            updated_at=datetime.fromisoformat(obj["updated_at"]),
-            closed_at=(
-                datetime.fromisoformat(obj["closed_at"])
-                if obj.get("closed_at")
-                else None
-            ),
+            created_at=_parse_datetime(obj["created_at"]),
+            updated_at=_parse_datetime(obj["updated_at"]),
+            closed_at=_parse_optional_datetime(obj.get("closed_at")),
             title=obj["title"],
             state=obj["state"],
             body=obj.get("body") or "",
@@ -223,18 +398,20 @@ def github_comments(
     with httpx.Client(
         transport=AugmentedTransport(actions_v0.authenticated_request_github)
     ) as client:
-        response_json = (
-            client.get(
-                f"https://api.github.com/repos/{owner}/{repo}/issues/{issue_number}/comments",
-                params={
-                    "page": page,
-                    "sort": sort,
-                    "direction": sort_direction,
-                },
+        response_json = _raise_for_status(
+            _maybe_retry_send(
+                client,
+                client.build_request(
+                    "GET",
+                    f"https://api.github.com/repos/{owner}/{repo}/issues/{issue_number}/comments",
+                    params={
+                        "page": page,
+                        "sort": sort,
+                        "direction": sort_direction,
+                    },
+                ),
             )
-            .raise_for_status()
-            .json()
-        )
+        ).json()
 
     comments = [
         GitHubComment(
@@ -242,8 +419,8 @@ def github_comments(
             body=comment["body"],
             user_id=comment["user"]["id"],
             user_login=comment["user"]["login"],
-            created_at=datetime.fromisoformat(comment["created_at"]),
-            updated_at=datetime.fromisoformat(comment["updated_at"]),
+            created_at=_parse_datetime(comment["created_at"]),
+            updated_at=_parse_datetime(comment["updated_at"]),
         )
         for comment in response_json
     ]
@@ -1,9 +1,12 @@
 """Tests for the github plugin.
 
-These tests hit a real GitHub repo, so they require an internet connection
+Most of these tests hit a real GitHub repo, so they require an internet connection
 and should not be run excessively to avoid rate limit issues.
 """
 
+import asyncio
+import email.utils
+import time
 import types
 import unittest
 from unittest.mock import patch
@@ -24,6 +27,44 @@ class MyTestHttpxClient(httpx.Client):
         super().__init__(*args, **kwargs)
 
 
+def _mock_httpx_client(handler):
+    """Returns an httpx.Client class that sends requests to handler, not the network."""
+
+    class MockHttpxClient(httpx.Client):
+        def __init__(self, *args, **kwargs):
+            kwargs["transport"] = httpx.MockTransport(handler)
+            super().__init__(*args, **kwargs)
+
+    return MockHttpxClient
+
+
+def _mock_httpx_async_client(handler):
+    """Same as _mock_httpx_client, for the async actions."""
+
+    class MockHttpxAsyncClient(httpx.AsyncClient):
+        def __init__(self, *args, **kwargs):
+            kwargs["transport"] = httpx.MockTransport(handler)
+            super().__init__(*args, **kwargs)
+
+    return MockHttpxAsyncClient
+
+
+def _pull_request_json(pull_request_id):
+    return {
+        "id": pull_request_id,
+        "html_url": f"https://github.com/d8e-ai/lutra-plugin/pull/{pull_request_id}",
+        "created_at": "2024-01-01T00:00:00Z",
+        "updated_at": "2024-01-02T00:00:00Z",
+        "merged_at": None,
+        "closed_at": None,
+        "title": f"Pull request {pull_request_id}",
+        "state": "open",
+        "draft": False,
+        "body": None,
+        "user": {"id": 1, "login": "octocat"},
+    }
+
+
 class TestPlugin(unittest.TestCase):
     @patch("plugin.httpx.Client", new=MyTestHttpxClient)
     def _test_github_pulls(self):
@@ -43,6 +84,137 @@ class TestPlugin(unittest.TestCase):
         )
         self.assertEqual(result[0].title, "Rename to Lutra")
 
+    def test_github_pulls_query_params(self):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json=[])
+
+        with patch("plugin.httpx.Client", new=_mock_httpx_client(handler)):
+            result = plugin.github_pulls(
+                owner="d8e-ai", repo="lutra-plugin", state="all"
+            )
+        self.assertEqual(result, [])
+        self.assertEqual(len(requests), 1)
+        self.assertEqual(
+            requests[0].url.params,
+            httpx.QueryParams(
+                {
+                    "state": "all",
+                    "page": 1,
+                    "per_page": 100,
+                    "sort": "created",
+                    "direction": "desc",
+                }
+            ),
+        )
+
+    def test_github_pulls_retries_when_rate_limited(self):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            if len(requests) == 1:
+                return httpx.Response(429, headers={"retry-after": "0"})
+            return httpx.Response(200, json=[])
+
+        with patch("plugin.httpx.Client", new=_mock_httpx_client(handler)):
+            result = plugin.github_pulls(owner="d8e-ai", repo="lutra-plugin")
+        self.assertEqual(result, [])
+        self.assertEqual(len(requests), 2)
+
+    def test_github_pulls_reports_long_rate_limit(self):
+        def handler(request):
+            return httpx.Response(
+                403,
+                headers={
+                    "x-ratelimit-remaining": "0",
+                    "x-ratelimit-reset": str(int(time.time()) + 3600),
+                },
+            )
+
+        with patch("plugin.httpx.Client", new=_mock_httpx_client(handler)):
+            with self.assertRaisesRegex(RuntimeError, "rate limit exceeded"):
+                plugin.github_pulls(owner="d8e-ai", repo="lutra-plugin")
+
+    def test_rate_limit_wait_seconds_with_http_date_retry_after(self):
+        retry_after = email.utils.formatdate(time.time() + 30, usegmt=True)
+        response = httpx.Response(429, headers={"retry-after": retry_after})
+        self.assertAlmostEqual(
+            plugin._rate_limit_wait_seconds(response), 30.0, delta=2.0
+        )
+        # Dates in the past mean retrying right away.
+        response = httpx.Response(
+            429, headers={"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}
+        )
+        self.assertEqual(plugin._rate_limit_wait_seconds(response), 0.0)
+
+    def test_rate_limit_wait_seconds_with_malformed_retry_after(self):
+        # Falls back to the reset header if there is one...
+        response = httpx.Response(
+            403,
+            headers={
+                "retry-after": "soon",
+                "x-ratelimit-remaining": "0",
+                "x-ratelimit-reset": str(int(time.time()) + 30),
+            },
+        )
+        self.assertAlmostEqual(
+            plugin._rate_limit_wait_seconds(response), 30.0, delta=2.0
+        )
+        # ...and to waiting a minute otherwise.
+        response = httpx.Response(403, headers={"retry-after": "soon"})
+        self.assertEqual(plugin._rate_limit_wait_seconds(response), 60.0)
+
+    def test_rate_limit_wait_seconds_with_negative_retry_after(self):
+        response = httpx.Response(429, headers={"retry-after": "-5"})
+        self.assertEqual(plugin._rate_limit_wait_seconds(response), 0.0)
+
+    def test_rate_limit_wait_seconds_without_reset(self):
+        response = httpx.Response(403, headers={"x-ratelimit-remaining": "0"})
+        self.assertEqual(
+            [plugin._rate_limit_wait_seconds(response, attempt) for attempt in (1, 2)],
+            [
+                plugin._MIN_RATE_LIMIT_WAIT_SECONDS,
+                2 * plugin._MIN_RATE_LIMIT_WAIT_SECONDS,
+            ],
+        )
+
+    def test_github_pulls_pages(self):
+        in_flight = 0
+        max_in_flight = 0
+
+        async def handler(request):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            # Let the other page requests start before this one finishes.
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            page = int(request.url.params["page"])
+            # Pages 1 to 10 have two pull requests each; later pages are empty.
+            if page > 10:
+                return httpx.Response(200, json=[])
+            return httpx.Response(
+                200,
+                json=[_pull_request_json(2 * page - 1), _pull_request_json(2 * page)],
+            )
+
+        pages = [3, 1, 2, *range(4, 13)]
+        with patch("plugin.httpx.AsyncClient", new=_mock_httpx_async_client(handler)):
+            result = asyncio.run(
+                plugin.github_pulls_pages(
+                    owner="d8e-ai", repo="lutra-plugin", pages=pages
+                )
+            )
+        # Results are in the order of `pages`, and empty pages contribute nothing.
+        self.assertEqual(
+            [pr.id for pr in result],
+            [5, 6, 1, 2, 3, 4, *range(7, 21)],
+        )
+        self.assertEqual(max_in_flight, plugin._MAX_CONCURRENT_PAGE_REQUESTS)
+
     @patch("plugin.httpx.Client", new=MyTestHttpxClient)
     def _test_github_issues(self):
         page = 1
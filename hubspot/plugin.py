@@ -1,9 +1,16 @@
-import urllib
-from dataclasses import dataclass
-from datetime import date, datetime
+import asyncio
+import email.utils
+import functools
+import math
+import time
+import urllib.parse
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
 from typing import (
     Any,
+    Callable,
     Dict,
+    Iterable,
     List,
     Literal,
     Mapping,
@@ -15,14 +22,14 @@ from typing import (
 )
 
 import httpx
-import pydantic
+import tenacity
 
 from lutraai.augmented_request_client import AsyncAugmentedTransport
 from lutraai.decorator import purpose
 from lutraai.requests import raise_error_text
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class HubSpotObjectType:
     """name represents the name of object in HubSpot CRM."""
 
@@ -49,12 +56,17 @@ class HubSpotObjectType:
     ]
 
 
-@dataclass
+_CONTACTS_OBJECT_TYPE = HubSpotObjectType("CONTACTS")
+_COMPANIES_OBJECT_TYPE = HubSpotObjectType("COMPANIES")
+_DEALS_OBJECT_TYPE = HubSpotObjectType("DEALS")
+
+
+@dataclass(slots=True)
 class HubSpotCustomObjectType:
     name: str
 
 
-@dataclass
+@dataclass(slots=True)
 class _HubSpotPropertiesSchema:
     """The schema for a HubSpot object's properties.
 
@@ -66,28 +78,213 @@ class _HubSpotPropertiesSchema:
     Mapping from property name to property schema. 
     """
 
+    property_names: tuple[str, ...] = field(init=False)
+    """
+    The names of all properties, computed once so that requests asking for every
+    property do not rebuild the list.
+    """
+
+    properties_query: str = field(init=False)
+    """
+    The URL-encoded `properties=...&properties=...` query string asking for every
+    property, computed once along with the schema.
+    """
+
+    to_lutra: dict[str, Callable[[Any], Any]] = field(init=False)
+    """
+    Mapping from property name to the function that coerces its HubSpot value to a
+    Lutra value, resolved once from the property type.
+    """
+
+    to_hubspot: dict[str, Callable[[Any], Union[str, int, bool]]] = field(init=False)
+    """
+    Mapping from property name to the function that coerces a Lutra value to its
+    HubSpot value, resolved once from the property type.
+    """
+
+    def __post_init__(self):
+        self.property_names = tuple(self.properties)
+        self.properties_query = _encode_properties_query(self.property_names)
+        self.to_lutra = {}
+        self.to_hubspot = {}
+        for name, property_schema in self.properties.items():
+            property_type = property_schema["type"].lower()
+            self.to_lutra[name] = _TO_LUTRA_COERCERS.get(property_type, str)
+            self.to_hubspot[name] = _TO_HUBSPOT_COERCERS.get(property_type, str)
+
+
+def _hubspot_client() -> httpx.AsyncClient:
+    """Returns a client for HubSpot API requests. Callers should use one client for all
+    of an action's requests, so that they share a connection.
+    """
+    return httpx.AsyncClient(
+        transport=AsyncAugmentedTransport(actions_v0.authenticated_request_hubspot),
+    )
+
+
+def _is_read_only_request(request: httpx.Request) -> bool:
+    # Searches and batch reads are POSTs, but do not modify anything.
+    return request.method == "GET" or request.url.path.endswith(
+        ("/search", "/batch/read")
+    )
+
+
+def _is_retryable(response: httpx.Response) -> bool:
+    """Returns whether a request may be retried, given its response.
+
+    See https://developers.hubspot.com/docs/api/usage-details#error-responses
+    """
+    if response.status_code == httpx.codes.TOO_MANY_REQUESTS:
+        # Rate-limited requests were not processed, so they are always safe to retry.
+        return True
+    # The server may have processed a request that failed with one of these, so only
+    # retry requests that do not modify anything.
+    return response.status_code in (
+        httpx.codes.BAD_GATEWAY,
+        httpx.codes.SERVICE_UNAVAILABLE,
+        httpx.codes.GATEWAY_TIMEOUT,
+    ) and _is_read_only_request(response.request)
+
+
+# The longest wait between retries. Responses that ask for a longer wait are reported
+# rather than waited out.
+_RETRY_MAX_WAIT_SECONDS = 30
+
+_wait_exponential = tenacity.wait_random_exponential(
+    multiplier=1, max=_RETRY_MAX_WAIT_SECONDS
+)
+
+
+def _get_rate_limit_reset_seconds(response: httpx.Response) -> Optional[float]:
+    """Returns how long to wait for HubSpot's rate limit window to reset, if the response
+    says that the window's requests are used up.
+
+    See https://developers.hubspot.com/docs/api/usage-details#rate-limits
+    """
+    remaining = response.headers.get("x-hubspot-ratelimit-remaining")
+    interval = response.headers.get("x-hubspot-ratelimit-interval-milliseconds")
+    if remaining != "0" or interval is None:
+        return None
+    try:
+        # The window resets within one interval.
+        return int(interval) / 1000
+    except ValueError:
+        return None
+
+
+def _get_requested_wait_seconds(response: httpx.Response) -> Optional[float]:
+    """Returns how long the response asks to wait before retrying, if it says."""
+    if (retry_after := response.headers.get("retry-after")) is not None:
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            pass
+        try:
+            # Retry-After can also be an HTTP date.
+            retry_at = email.utils.parsedate_to_datetime(retry_after)
+            return max(retry_at.timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            # Neither; fall back to the rate limit headers.
+            pass
+    return _get_rate_limit_reset_seconds(response)
+
+
+def _should_retry(response: httpx.Response) -> bool:
+    if not _is_retryable(response):
+        return False
+    wait = _get_requested_wait_seconds(response)
+    return wait is None or wait <= _RETRY_MAX_WAIT_SECONDS
+
+
+def _retry_wait_seconds(retry_state: tenacity.RetryCallState) -> float:
+    response = retry_state.outcome.result()
+    if (wait := _get_requested_wait_seconds(response)) is not None:
+        # `_should_retry` only retries waits of at most `_RETRY_MAX_WAIT_SECONDS`.
+        return min(wait, _RETRY_MAX_WAIT_SECONDS)
+    return _wait_exponential(retry_state)
+
+
+@tenacity.retry(
+    retry=tenacity.retry_if_result(_should_retry),
+    wait=_retry_wait_seconds,
+    stop=tenacity.stop_after_attempt(6),
+    # Give up by returning the last response, so that it is reported by
+    # `raise_error_text`.
+    retry_error_callback=lambda retry_state: retry_state.outcome.result(),
+)
+async def _send_with_retries(
+    client: httpx.AsyncClient, request: httpx.Request
+) -> httpx.Response:
+    return await client.send(request)
+
+
+async def _maybe_retry_send(
+    client: httpx.AsyncClient, request: httpx.Request
+) -> httpx.Response:
+    """Send a request using the client, retrying if appropriate."""
+    response = await _send_with_retries(client, request)
+    # Other retryable statuses, e.g. a 503 during maintenance, are left for
+    # `raise_error_text` to report as they are.
+    if (
+        response.status_code == httpx.codes.TOO_MANY_REQUESTS
+        and (wait := _get_requested_wait_seconds(response)) is not None
+        and wait > _RETRY_MAX_WAIT_SECONDS
+    ):
+        raise RuntimeError(
+            f"HubSpot rate limit exceeded; try again in {math.ceil(wait)} seconds"
+        )
+    return response
+
 
 async def _get_hubspot_properties_schema(
+    client: httpx.AsyncClient,
     object_type: HubSpotObjectType,
 ) -> _HubSpotPropertiesSchema:
-    async with httpx.AsyncClient(
-        transport=AsyncAugmentedTransport(actions_v0.authenticated_request_hubspot),
-    ) as client:
-        response = await client.get(
-            f"https://api.hubapi.com/crm/v3/properties/{object_type.name}"
-        )
-        await raise_error_text(response)
-        await response.aread()
-        return _HubSpotPropertiesSchema(
-            properties={prop["name"]: prop for prop in response.json()["results"]}
-        )
+    response = await _maybe_retry_send(
+        client,
+        client.build_request(
+            "GET", f"https://api.hubapi.com/crm/v3/properties/{object_type.name}"
+        ),
+    )
+    await raise_error_text(response)
+    await response.aread()
+    return _HubSpotPropertiesSchema(
+        properties={prop["name"]: prop for prop in response.json()["results"]}
+    )
+
+
+def _get_all_property_names(schema: _HubSpotPropertiesSchema) -> tuple[str, ...]:
+    return schema.property_names
+
+
+def _get_requested_property_names(
+    core_property_names: tuple[str, ...],
+    properties: Optional[Sequence[str]],
+) -> Optional[tuple[str, ...]]:
+    """Returns the names of the properties to request from HubSpot: the core properties
+    that the result type always needs, followed by the caller's `properties`.
 
+    Returns `None`, meaning every property in the schema, if `properties` is `None`.
+    """
+    if properties is None:
+        return None
+    return tuple(dict.fromkeys((*core_property_names, *properties)))
+
+
+def _encode_properties_query(property_names: Sequence[str]) -> str:
+    return urllib.parse.urlencode([("properties", name) for name in property_names])
 
-def _get_all_property_names(schema: _HubSpotPropertiesSchema) -> list[str]:
-    return list(schema.properties.keys())
+
+def _get_properties_query(
+    schema: _HubSpotPropertiesSchema,
+    property_names: Optional[Sequence[str]],
+) -> str:
+    if property_names is None:
+        return schema.properties_query
+    return _encode_properties_query(property_names)
 
 
-@dataclass
+@dataclass(slots=True)
 class HubSpotPropertyValue:
     """A property value from HubSpot.
 
@@ -97,7 +294,7 @@ class HubSpotPropertyValue:
     value: Any
 
 
-@dataclass
+@dataclass(slots=True)
 class HubSpotContact:
     """The `additional_properties` field stores any additional properties that are
     available in the HubSpot contact system that callers can ask for. If found, they
@@ -117,177 +314,378 @@ class HubSpotContact:
     archived: bool
 
 
-@dataclass
+# The contact properties that `HubSpotContact` is built from.
+_HUBSPOT_CONTACT_CORE_PROPERTIES = (
+    "firstname",
+    "lastname",
+    "email",
+    "hs_object_id",
+    "lastmodifieddate",
+)
+
+
+@dataclass(slots=True)
 class HubSpotPaginationToken:
     token: str
 
 
+def _get_next_pagination_token(
+    data: Dict[str, Any],
+) -> Optional[HubSpotPaginationToken]:
+    """Returns the token for the page after the one in a paged response, if any."""
+    if token := ((data.get("paging") or {}).get("next") or {}).get("after"):
+        return HubSpotPaginationToken(token=token)
+    return None
+
+
+# The maximum number of inputs sent in one HubSpot batch request.
+_HUBSPOT_BATCH_SIZE = 100
+
+# Cap on the number of batch reads in flight at once, to stay clear of HubSpot's rate
+# limits.
+_MAX_CONCURRENT_BATCH_READS = 4
+
+
+async def _post_batch_inputs(
+    client: httpx.AsyncClient,
+    url: str,
+    inputs: Sequence[Dict[str, Any]],
+) -> List[str]:
+    """Posts `inputs` to a batch create or update endpoint, at most `_HUBSPOT_BATCH_SIZE`
+    at a time, returning the IDs of the created or updated objects.
+    """
+    object_ids: List[str] = []
+    for start in range(0, len(inputs), _HUBSPOT_BATCH_SIZE):
+        response = await _maybe_retry_send(
+            client,
+            client.build_request(
+                "POST",
+                url,
+                json={"inputs": inputs[start : start + _HUBSPOT_BATCH_SIZE]},
+            ),
+        )
+        await raise_error_text(response)
+        await response.aread()
+        data = response.json()
+        object_ids.extend(result["id"] for result in data["results"])
+    return object_ids
+
+
+async def _post_batch_reads(
+    client: httpx.AsyncClient,
+    url: str,
+    object_ids: Sequence[str],
+    **payload: Any,
+) -> List[Dict[str, Any]]:
+    """Posts `object_ids`, along with `payload`, to a batch read endpoint, returning the
+    results of every batch. The IDs are sent at most `_HUBSPOT_BATCH_SIZE` at a time,
+    with up to `_MAX_CONCURRENT_BATCH_READS` requests in flight at once.
+    """
+    # HubSpot rejects batches that repeat an ID.
+    object_ids = list(dict.fromkeys(object_ids))
+    # `httpx.Limits` has no effect with a custom transport, so limit concurrency here.
+    semaphore = asyncio.Semaphore(_MAX_CONCURRENT_BATCH_READS)
+
+    async def fetch_batch(start: int) -> Dict[str, Any]:
+        inputs = [
+            {"id": object_id}
+            for object_id in object_ids[start : start + _HUBSPOT_BATCH_SIZE]
+        ]
+        async with semaphore:
+            response = await _maybe_retry_send(
+                client,
+                client.build_request("POST", url, json={"inputs": inputs, **payload}),
+            )
+            await raise_error_text(response)
+            await response.aread()
+        return response.json()
+
+    batches = await asyncio.gather(
+        *(
+            fetch_batch(start)
+            for start in range(0, len(object_ids), _HUBSPOT_BATCH_SIZE)
+        )
+    )
+    return [result for data in batches for result in data.get("results") or ()]
+
+
+async def _batch_read_hubspot_objects(
+    client: httpx.AsyncClient,
+    object_path: str,
+    object_ids: Sequence[str],
+    property_names: Sequence[str],
+) -> List[Dict[str, Any]]:
+    """Fetches the objects with the given IDs from the batch read endpoint, e.g.
+    `object_path="deals"`, returning the raw results in the order of `object_ids`.
+    Objects that do not exist and repeated IDs are left out.
+    """
+    results = await _post_batch_reads(
+        client,
+        f"https://api.hubapi.com/crm/v3/objects/{object_path}/batch/read",
+        object_ids,
+        properties=property_names,
+    )
+    results_by_id = {result["id"]: result for result in results}
+    return [
+        results_by_id[object_id]
+        for object_id in dict.fromkeys(object_ids)
+        if object_id in results_by_id
+    ]
+
+
+async def _fetch_hubspot_objects_page(
+    client: httpx.AsyncClient,
+    object_path: str,
+    properties_query: str,
+    pagination_token: Optional[HubSpotPaginationToken] = None,
+) -> Dict[str, Any]:
+    """Fetches a page of objects from the list endpoint, e.g. `object_path="contacts"`,
+    returning the raw response data.
+    """
+    url = (
+        f"https://api.hubapi.com/crm/v3/objects/{object_path}"
+        f"?limit=100&{properties_query}"
+    )
+    if pagination_token:
+        url += "&" + urllib.parse.urlencode({"after": pagination_token.token})
+    response = await _maybe_retry_send(client, client.build_request("GET", url))
+    await raise_error_text(response)
+    await response.aread()
+    return response.json()
+
+
+# Mapping from lowercased string representations of booleans to their values. These
+# are the same representations that Pydantic's tolerant boolean parsing accepts.
+_BOOL_STRINGS: dict[str, bool] = {
+    "1": True,
+    "on": True,
+    "t": True,
+    "true": True,
+    "y": True,
+    "yes": True,
+    "0": False,
+    "off": False,
+    "f": False,
+    "false": False,
+    "n": False,
+    "no": False,
+}
+
+
+def _to_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        if (parsed := _BOOL_STRINGS.get(value.lower())) is not None:
+            return parsed
+    elif isinstance(value, int | float) and value in (0, 1):
+        return bool(value)
+    raise ValueError(f"Unexpected boolean format: {value} ({type(value)})")
+
+
+def _coerce_bool_to_lutra(value: Any) -> Optional[bool]:
+    if value == "":
+        return None  # The value is an empty string when the boolean is not set
+    # HubSpot boolean properties seem to come as the strings "true" and "false," but we
+    # can't find a guarantee that they do, so accept many boolean representations just
+    # in case.
+    return _to_bool(value)
+
+
+# HubSpot timestamps such as `createdate` and `hs_lastmodifieddate` often repeat across
+# the objects of a page (e.g. after imports or bulk updates), so cache their parsing.
+# `datetime`s are immutable, so sharing them between objects is safe.
+_parse_hubspot_datetime = functools.lru_cache(maxsize=4096)(datetime.fromisoformat)
+
+
+def _coerce_date_to_lutra(value: Any) -> Optional[Union[date, datetime]]:
+    if isinstance(value, datetime):
+        return value
+    elif isinstance(value, str):
+        # The value is an empty string when the date is not set
+        return date.fromisoformat(value) if value else None
+    else:
+        raise ValueError(f"Unexpected date format: {value} ({type(value)})")
+
+
+def _coerce_datetime_to_lutra(value: Any) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value
+    elif isinstance(value, str):
+        # The value is an empty string when the date is not set
+        return _parse_hubspot_datetime(value) if value else None
+    else:
+        raise ValueError(f"Unexpected datetime format: {value} ({type(value)})")
+
+
+def _coerce_number_to_lutra(value: Any) -> Union[int, float]:
+    if isinstance(value, str):
+        if "." in value:
+            return float(value)
+        elif value == "":
+            # The value is an empty string when the number is not set. Default to 0.
+            return 0
+        else:
+            return int(value)
+    elif isinstance(value, int | float):
+        return value
+    else:
+        return float(value)
+
+
+# Mapping from lowercased HubSpot property type to the function that coerces a HubSpot
+# value of that type to a Lutra value. Other/unknown types are coerced to `str`.
+_TO_LUTRA_COERCERS: dict[str, Callable[[Any], Any]] = {
+    "bool": _coerce_bool_to_lutra,
+    "date": _coerce_date_to_lutra,
+    "datetime": _coerce_datetime_to_lutra,
+    "number": _coerce_number_to_lutra,
+}
+
+
 def _coerce_properties_to_lutra(
     properties: Mapping[str, Union[str, int, float, date, datetime, bool]],
     schema: _HubSpotPropertiesSchema,
 ) -> Dict[str, HubSpotPropertyValue]:
     coerced_properties: Dict[str, HubSpotPropertyValue] = {}
+    # This runs for every property of every result, so look up the methods once.
+    get_coercer = schema.to_lutra.get
+    property_value = HubSpotPropertyValue
     for name, value in properties.items():
-        property_schema = schema.properties.get(name)
-        if property_schema is None:
-            # Fall back to `str` if the property is unknown.
-            c_value = str(value)
-        else:
-            match property_schema["type"].lower():
-                case "bool":
-                    if value == "":
-                        c_value = None  # The value is an empty string when the boolean is not set
-                    else:
-                        # HubSpot boolean properties seem to come as the strings "true" and "false," but we
-                        # can't find a guarantee that they do, so use Pydantic parsing to accept many boolean
-                        # representations just in case.
-                        c_value = pydantic.parse_obj_as(bool, value)
-                case "date":
-                    if isinstance(value, datetime):
-                        c_value = value
-                    elif isinstance(value, str):
-                        # The value is an empty string when the date is not set
-                        c_value = date.fromisoformat(value) if value else None
-                    else:
-                        raise ValueError(
-                            f"Unexpected date format: {value} ({type(value)})"
-                        )
-                case "datetime":
-                    if isinstance(value, datetime):
-                        c_value = value
-                    elif isinstance(value, str):
-                        # The value is an empty string when the date is not set
-                        c_value = datetime.fromisoformat(value) if value else None
-                    else:
-                        raise ValueError(
-                            f"Unexpected datetime format: {value} ({type(value)})"
-                        )
-                case "number":
-                    if isinstance(value, str):
-                        if "." in value:
-                            c_value = float(value)
-                        elif (
-                            value == ""
-                        ):  # The value is an empty string when the number is not set. Default to 0.
-                            c_value = 0
-                        else:
-                            c_value = int(value)
-                    elif isinstance(value, int | float):
-                        c_value = value
-                    else:
-                        c_value = float(value)
-                case _:
-                    # Coerce to string for other/unknown types.
-                    c_value = str(value)
-
+        if value is None:
+            continue
+        # Fall back to `str` if the property is unknown.
+        c_value = get_coercer(name, str)(value)
         if c_value is not None:
-            coerced_properties[name] = HubSpotPropertyValue(value=c_value)
+            coerced_properties[name] = property_value(value=c_value)
 
     return coerced_properties
 
 
+def _coerce_bool_to_hubspot(value: Any) -> bool:
+    # Because `value` comes from Lutra's codegen, we try to accept many representations of
+    # boolean. The HubSpot API seems to accept boolean values in the JSON request.
+    return _to_bool(value)
+
+
+def _coerce_date_to_hubspot(value: Any) -> str:
+    if isinstance(value, date):
+        return value.isoformat()
+    else:
+        raise ValueError(f"Unexpected date format: {value} ({type(value)})")
+
+
+def _coerce_datetime_to_hubspot(value: Any) -> int:
+    if isinstance(value, datetime):
+        return int(value.timestamp() * 1000)
+    else:
+        raise ValueError(f"Unexpected datetime format: {value} ({type(value)})")
+
+
+# Mapping from lowercased HubSpot property type to the function that coerces a Lutra
+# value to a HubSpot value of that type. Other/unknown types are coerced to `str`.
+_TO_HUBSPOT_COERCERS: dict[str, Callable[[Any], Union[str, int, bool]]] = {
+    "bool": _coerce_bool_to_hubspot,
+    "date": _coerce_date_to_hubspot,
+    "datetime": _coerce_datetime_to_hubspot,
+}
+
+
 def _coerce_value_to_hubspot(
     name: str,
     value: Any,
     schema: _HubSpotPropertiesSchema,
 ) -> Union[str, int, bool]:
-    property_schema = schema.properties.get(name)
-    if property_schema is None:
-        # Fall back to `str` if the property is unknown.
-        return str(value)
-    match property_schema["type"].lower():
-        case "bool":
-            # Because `value` comes from Lutra's codegen, we try to accept many representations of
-            # boolean, using Pydantic's tolerant logic. The HubSpot API seems to accept boolean
-            # values in the JSON request.
-            return pydantic.parse_obj_as(bool, value)
-        case "date":
-            if isinstance(value, date):
-                return value.isoformat()
-            else:
-                raise ValueError(f"Unexpected date format: {value} ({type(value)})")
-        case "datetime":
-            if isinstance(value, datetime):
-                return int(value.timestamp() * 1000)
-            else:
-                raise ValueError(f"Unexpected datetime format: {value} ({type(value)})")
-        case _:
-            # Coerce to string for other/unknown types.
-            return str(value)
+    # Fall back to `str` if the property is unknown.
+    return schema.to_hubspot.get(name, str)(value)
 
 
 def _coerce_properties_to_hubspot(
-    properties: Mapping[
-        str, Union[str, int, float, date, datetime, bool, HubSpotPropertyValue]
+    properties: Union[
+        Mapping[
+            str, Union[str, int, float, date, datetime, bool, HubSpotPropertyValue]
+        ],
+        Iterable[
+            Tuple[
+                str, Union[str, int, float, date, datetime, bool, HubSpotPropertyValue]
+            ]
+        ],
     ],
     schema: _HubSpotPropertiesSchema,
 ) -> Dict[str, Union[str, int, bool]]:
-    coerced_properties = {}
-    for name, value in properties.items():
-        if isinstance(value, HubSpotPropertyValue):
-            value = value.value
-        coerced_properties[name] = _coerce_value_to_hubspot(
-            name=name,
-            value=value,
-            schema=schema,
+    """Coerces a mapping, or (name, value) pairs, to HubSpot values. If a name repeats
+    in the pairs, its last value wins, as when building a dict from them.
+    """
+    if isinstance(properties, Mapping):
+        properties = properties.items()
+    to_hubspot = schema.to_hubspot
+    return {
+        # Fall back to `str` if the property is unknown.
+        name: to_hubspot.get(name, str)(
+            value.value if isinstance(value, HubSpotPropertyValue) else value
         )
+        for name, value in properties
+    }
 
-    return coerced_properties
+
+# The fallback for timestamps missing from HubSpot API items.
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
 
 
 def _get_datetime_with_fallback(api_item: Dict[str, Any], key: str) -> datetime:
-    # Note: `x.get(y) or z` is safer than `x.get(y, z)` in the case that `x[y]` is present and `None`.
-    return datetime.fromisoformat(api_item.get(key) or "1970-01-01T00:00:00Z")
+    # Note: `x.get(y)` then a falsy check is safer than `x.get(y, z)` in the case that `x[y]` is
+    # present and `None`.
+    value = api_item.get(key)
+    return _parse_hubspot_datetime(value) if value else _EPOCH
 
 
 def _parse_hubspot_contact(
     api_item: Dict[str, Any], properties_schema: _HubSpotPropertiesSchema
 ) -> HubSpotContact:
     properties = api_item.get("properties") or {}
+    get = properties.get
     return HubSpotContact(
         created_at=_get_datetime_with_fallback(api_item, "createdAt"),
         updated_at=_get_datetime_with_fallback(api_item, "updatedAt"),
         archived=api_item.get("archived") or False,
-        firstname=properties.get("firstname") or "",
-        lastname=properties.get("lastname") or "",
-        email=properties.get("email") or "",
-        hs_object_id=properties.get("hs_object_id") or "",
+        firstname=get("firstname") or "",
+        lastname=get("lastname") or "",
+        email=get("email") or "",
+        hs_object_id=get("hs_object_id") or "",
         # TODO: Verify if "lastmodifieddate" is correct here.
         # It seems that "lastmodifieddate" is defined on Contacts, but not other object types, and
         # there is also "hs_lastmodifieddate" that is defined on other object types but not
         # Contacts.
         last_modified_date=_get_datetime_with_fallback(properties, "lastmodifieddate"),
         additional_properties=_coerce_properties_to_lutra(
-            {key: val for key, val in properties.items() if val is not None},
+            properties,
             schema=properties_schema,
         ),
     )
 
 
-async def _list_contacts(
-    schema: _HubSpotPropertiesSchema,
-    pagination_token: Optional[HubSpotPaginationToken] = None,
+def _parse_hubspot_contacts_page(
+    data: Dict[str, Any], schema: _HubSpotPropertiesSchema
 ) -> Tuple[List[HubSpotContact], Optional[HubSpotPaginationToken]]:
-    url = "https://api.hubapi.com/crm/v3/objects/contacts"
-    params: Dict[str, Any] = {"limit": 100}
-    if pagination_token:
-        params["after"] = pagination_token.token
-    params["properties"] = _get_all_property_names(schema)
-    async with httpx.AsyncClient(
-        transport=AsyncAugmentedTransport(actions_v0.authenticated_request_hubspot),
-    ) as client:
-        response = await client.get(url, params=params)
-        await raise_error_text(response)
-        await response.aread()
-        data = response.json()
-
     contacts = [
-        _parse_hubspot_contact(item, schema) for item in data.get("results") or []
+        _parse_hubspot_contact(item, schema) for item in data.get("results") or ()
     ]
-    token = data.get("paging", {}).get("next", {}).get("after")
-    next_pagination_token = HubSpotPaginationToken(token=token) if token else None
+    return contacts, _get_next_pagination_token(data)
 
-    return contacts, next_pagination_token
+
+async def _list_contacts(
+    client: httpx.AsyncClient,
+    schema: _HubSpotPropertiesSchema,
+    pagination_token: Optional[HubSpotPaginationToken] = None,
+    property_names: Optional[Sequence[str]] = None,
+) -> Tuple[List[HubSpotContact], Optional[HubSpotPaginationToken]]:
+    data = await _fetch_hubspot_objects_page(
+        client,
+        "contacts",
+        _get_properties_query(schema, property_names),
+        pagination_token,
+    )
+    return _parse_hubspot_contacts_page(data, schema)
 
 
 @purpose("Create contacts.")
@@ -301,40 +699,34 @@ async def hubspot_create_contacts(contacts: Sequence[HubSpotContact]) -> List[st
     Returns:
         A list of strings, where each string is the ID of a created contact.
     """
-    schema = await _get_hubspot_properties_schema(HubSpotObjectType("CONTACTS"))
-
     url = "https://api.hubapi.com/crm/v3/objects/contacts/batch/create"
 
-    # Prepare the payload from the contacts list
-    contacts_payload = []
-    for contact in contacts:
-        properties: Dict[str, Any] = {
-            "firstname": contact.firstname,
-            "lastname": contact.lastname,
-            "email": contact.email,
-        }
-        additional_properties = _coerce_properties_to_hubspot(
-            contact.additional_properties,
-            schema=schema,
-        )
-        properties.update(additional_properties)
-        contact_data = {
-            "properties": properties,
-        }
-        contacts_payload.append(contact_data)
-
-    payload = {"inputs": contacts_payload}
+    async with _hubspot_client() as client:
+        if any(contact.additional_properties for contact in contacts):
+            schema = await _get_hubspot_properties_schema(client, _CONTACTS_OBJECT_TYPE)
+        else:
+            # Only additional properties are coerced using the schema, so there is no
+            # need to fetch it.
+            schema = _HubSpotPropertiesSchema(properties={})
 
-    async with httpx.AsyncClient(
-        transport=AsyncAugmentedTransport(actions_v0.authenticated_request_hubspot),
-    ) as client:
-        response = await client.post(url, json=payload)
-        await raise_error_text(response)
-        await response.aread()
-        data = response.json()
+        # Prepare the inputs from the contacts list
+        inputs = [
+            {
+                "properties": {
+                    "firstname": contact.firstname,
+                    "lastname": contact.lastname,
+                    "email": contact.email,
+                    **_coerce_properties_to_hubspot(
+                        contact.additional_properties,
+                        schema=schema,
+                    ),
+                },
+            }
+            for contact in contacts
+        ]
 
-    # Extract and return the IDs of the created contacts
-    return [result["id"] for result in data["results"]]
+        # Return the IDs of the created contacts
+        return await _post_batch_inputs(client, url, inputs)
 
 
 @purpose("Update contacts.")
@@ -399,63 +791,55 @@ async def hubspot_update_contacts(
     hs_is_unworked: Contact has not been assigned or has not been engaged after last owner assignment/re-assignment.
     hs_sequences_is_enrolled: A yes/no field that indicates whether the contact is currently in a Sequence.
     """
-    schema = await _get_hubspot_properties_schema(HubSpotObjectType("CONTACTS"))
-
     url = "https://api.hubapi.com/crm/v3/objects/contacts/batch/update"
 
-    payload = [
-        {
-            "id": contact_id,
-            "properties": _coerce_properties_to_hubspot(
-                dict(properties),
-                schema=schema,
-            ),
-        }
-        for contact_id, properties in contact_updates.items()
-    ]
-
-    async with httpx.AsyncClient(
-        transport=AsyncAugmentedTransport(actions_v0.authenticated_request_hubspot),
-    ) as client:
-        response = await client.post(url, json={"inputs": payload})
-        await raise_error_text(response)
-        await response.aread()
-        data = response.json()
-        return [result["id"] for result in data["results"]]
+    async with _hubspot_client() as client:
+        schema = await _get_hubspot_properties_schema(client, _CONTACTS_OBJECT_TYPE)
+        inputs = [
+            {
+                "id": contact_id,
+                "properties": _coerce_properties_to_hubspot(
+                    properties,
+                    schema=schema,
+                ),
+            }
+            for contact_id, properties in contact_updates.items()
+        ]
+        return await _post_batch_inputs(client, url, inputs)
 
 
 async def _search_contacts(
+    client: httpx.AsyncClient,
     filter_groups: List[Dict[str, List[Dict[str, Any]]]],
     schema: _HubSpotPropertiesSchema,
     pagination_token: Optional[HubSpotPaginationToken] = None,
+    property_names: Optional[Sequence[str]] = None,
 ) -> Tuple[List[HubSpotContact], Optional[HubSpotPaginationToken]]:
     if not filter_groups:
-        # The API will fail with an empty list
-        return [], None
+        # The search API fails with an empty list, and no filters means all contacts.
+        return await _list_contacts(client, schema, pagination_token, property_names)
     url = "https://api.hubapi.com/crm/v3/objects/contacts/search"
     payload = {
         "filterGroups": filter_groups,
-        "properties": _get_all_property_names(schema),
+        "properties": (
+            _get_all_property_names(schema)
+            if property_names is None
+            else property_names
+        ),
         "limit": 100,
     }
     if pagination_token:
         payload["after"] = pagination_token.token
-    async with httpx.AsyncClient(
-        transport=AsyncAugmentedTransport(actions_v0.authenticated_request_hubspot),
-    ) as client:
-        response = await client.post(url, json=payload)
-        await raise_error_text(response)
-        await response.aread()
-        data = response.json()
-        contacts = [
-            _parse_hubspot_contact(item, schema) for item in data.get("results") or []
-        ]
-        token = data.get("paging", {}).get("next", {}).get("after")
-        next_pagination_token = HubSpotPaginationToken(token=token) if token else None
-        return contacts, next_pagination_token
+    response = await _maybe_retry_send(
+        client, client.build_request("POST", url, json=payload)
+    )
+    await raise_error_text(response)
+    await response.aread()
+    data = response.json()
+    return _parse_hubspot_contacts_page(data, schema)
 
 
-@dataclass
+@dataclass(slots=True)
 class HubSpotSearchCondition:
     property_name: str
     operator: Literal[
@@ -471,14 +855,14 @@ class HubSpotSearchCondition:
     value: HubSpotPropertyValue
 
 
-@dataclass
+@dataclass(slots=True)
 class AndGroup:
     """A group of conditions that must ALL be true (AND logic). Maximum of 6 conditions"""
 
     conditions: List[HubSpotSearchCondition]
 
 
-@dataclass
+@dataclass(slots=True)
 class SearchQuery:
     """
     Top-level search query that combines multiple AND groups with OR logic.
@@ -502,6 +886,10 @@ class FilterGroup(TypedDict):
     filters: List[Filter]
 
 
+# Search operators that only check whether a property is set, and take no value.
+_VALUELESS_OPERATORS = frozenset({"HAS_PROPERTY", "NOT_HAS_PROPERTY"})
+
+
 def _convert_and_groups_to_filter_groups(
     and_groups: List[AndGroup], schema: _HubSpotPropertiesSchema
 ) -> List[FilterGroup]:
@@ -518,7 +906,7 @@ def _convert_and_groups_to_filter_groups(
                 "propertyName": condition.property_name,
                 "operator": condition.operator,
             }
-            if condition.operator not in ("HAS_PROPERTY", "NOT_HAS_PROPERTY"):
+            if condition.operator not in _VALUELESS_OPERATORS:
                 value = _coerce_value_to_hubspot(
                     name=condition.property_name,
                     value=condition.value.value,
@@ -558,6 +946,7 @@ def _convert_and_groups_to_filter_groups(
 async def hubspot_search_contacts(
     query: SearchQuery,
     pagination_token: Optional[HubSpotPaginationToken] = None,
+    properties: Optional[List[str]] = None,
 ) -> Tuple[List[HubSpotContact], Optional[HubSpotPaginationToken]]:
     """Search for HubSpot contacts using OR-of-ANDs boolean logic.
 
@@ -581,17 +970,40 @@ async def hubspot_search_contacts(
             HubSpotSearchCondition("hs_object_id", "EQ", HubSpotPropertyValue("ID3"))
         ])
     ])
+
+    If `properties` is given, only those properties (plus the ones needed to fill in
+    the HubSpotContact fields) are fetched into `additional_properties`; otherwise
+    every contact property is fetched. Pass the properties you need when possible, as
+    fetching every property makes responses much larger.
     """
-    schema = await _get_hubspot_properties_schema(HubSpotObjectType("CONTACTS"))
+    async with _hubspot_client() as client:
+        property_names = _get_requested_property_names(
+            _HUBSPOT_CONTACT_CORE_PROPERTIES, properties
+        )
 
-    if not query.or_groups:
-        return await _list_contacts(schema, pagination_token)
+        if not query.or_groups and property_names is not None:
+            # Listing explicit properties only needs the schema to parse the results, so
+            # fetch the schema and the page at the same time.
+            schema, data = await asyncio.gather(
+                _get_hubspot_properties_schema(client, _CONTACTS_OBJECT_TYPE),
+                _fetch_hubspot_objects_page(
+                    client,
+                    "contacts",
+                    _encode_properties_query(property_names),
+                    pagination_token,
+                ),
+            )
+            return _parse_hubspot_contacts_page(data, schema)
+
+        schema = await _get_hubspot_properties_schema(client, _CONTACTS_OBJECT_TYPE)
 
-    filter_groups = _convert_and_groups_to_filter_groups(query.or_groups, schema)
-    return await _search_contacts(filter_groups, schema, pagination_token)
+        filter_groups = _convert_and_groups_to_filter_groups(query.or_groups, schema)
+        return await _search_contacts(
+            client, filter_groups, schema, pagination_token, property_names
+        )
 
 
-@dataclass
+@dataclass(slots=True)
 class HubSpotCompany:
     """The `additional_properties` field stores any additional properties that are
     available in the HubSpot contact system that callers can ask for. If found, they
@@ -610,51 +1022,59 @@ class HubSpotCompany:
     archived: bool
 
 
+# The company properties that `HubSpotCompany` is built from.
+_HUBSPOT_COMPANY_CORE_PROPERTIES = (
+    "name",
+    "domain",
+    "hs_object_id",
+    "hs_lastmodifieddate",
+)
+
+
 def _parse_hubspot_company(
     api_item: dict, schema: _HubSpotPropertiesSchema
 ) -> HubSpotCompany:
     properties = api_item.get("properties") or {}
+    get = properties.get
     return HubSpotCompany(
         created_at=_get_datetime_with_fallback(api_item, "createdAt"),
         updated_at=_get_datetime_with_fallback(api_item, "updatedAt"),
         archived=api_item.get("archived") or False,
-        name=properties.get("name") or "",
-        domain=properties.get("domain") or "",
-        hs_object_id=properties.get("hs_object_id") or "",
+        name=get("name") or "",
+        domain=get("domain") or "",
+        hs_object_id=get("hs_object_id") or "",
         last_modified_date=_get_datetime_with_fallback(
             properties, "hs_lastmodifieddate"
         ),
         additional_properties=_coerce_properties_to_lutra(
-            {key: val for key, val in properties.items() if val is not None},
+            properties,
             schema=schema,
         ),
     )
 
 
-async def _list_companies(
-    schema: _HubSpotPropertiesSchema,
-    pagination_token: Optional[HubSpotPaginationToken] = None,
+def _parse_hubspot_companies_page(
+    data: Dict[str, Any], schema: _HubSpotPropertiesSchema
 ) -> Tuple[List[HubSpotCompany], Optional[HubSpotPaginationToken]]:
-    url = "https://api.hubapi.com/crm/v3/objects/companies"
-    params: Dict[str, Any] = {"limit": 100}
-    if pagination_token:
-        params["after"] = pagination_token.token
-    params["properties"] = _get_all_property_names(schema)
-    async with httpx.AsyncClient(
-        transport=AsyncAugmentedTransport(actions_v0.authenticated_request_hubspot),
-    ) as client:
-        response = await client.get(url, params=params)
-        await raise_error_text(response)
-        await response.aread()
-        data = response.json()
-
     companies = [
-        _parse_hubspot_company(item, schema) for item in data.get("results") or []
+        _parse_hubspot_company(item, schema) for item in data.get("results") or ()
     ]
-    token = data.get("paging", {}).get("next", {}).get("after")
-    next_pagination_token = HubSpotPaginationToken(token=token) if token else None
+    return companies, _get_next_pagination_token(data)
 
-    return companies, next_pagination_token
+
+async def _list_companies(
+    client: httpx.AsyncClient,
+    schema: _HubSpotPropertiesSchema,
+    pagination_token: Optional[HubSpotPaginationToken] = None,
+    property_names: Optional[Sequence[str]] = None,
+) -> Tuple[List[HubSpotCompany], Optional[HubSpotPaginationToken]]:
+    data = await _fetch_hubspot_objects_page(
+        client,
+        "companies",
+        _get_properties_query(schema, property_names),
+        pagination_token,
+    )
+    return _parse_hubspot_companies_page(data, schema)
 
 
 @purpose("Create companies.")
@@ -673,29 +1093,20 @@ async def hubspot_create_companies(companies: Sequence[HubSpotCompany]) -> List[
     """
     url = "https://api.hubapi.com/crm/v3/objects/companies/batch/create"
 
-    # Prepare the payload from the contacts list
-    company_payload = []
-    for company in companies:
-        company_data = {
+    # Prepare the inputs from the companies list
+    inputs = [
+        {
             "properties": {
                 "name": company.name,
                 "domain": company.domain,
             }
         }
-        company_payload.append(company_data)
-
-    payload = {"inputs": company_payload}
-
-    async with httpx.AsyncClient(
-        transport=AsyncAugmentedTransport(actions_v0.authenticated_request_hubspot),
-    ) as client:
-        response = await client.post(url, json=payload)
-        await raise_error_text(response)
-        await response.aread()
-        data = response.json()
+        for company in companies
+    ]
 
-    # Extract and return the IDs of the created company
-    return [result["id"] for result in data["results"]]
+    async with _hubspot_client() as client:
+        # Return the IDs of the created companies
+        return await _post_batch_inputs(client, url, inputs)
 
 
 @purpose("Update companies.")
@@ -756,65 +1167,119 @@ async def hubspot_update_companies(
     hs_is_target_account: Identifies whether this company is being marketed and sold to as part of your account-based strategy.
     is_public: Indicates if the company is publicly traded.
     """
-    schema = await _get_hubspot_properties_schema(HubSpotObjectType("COMPANIES"))
     url = "https://api.hubapi.com/crm/v3/objects/companies/batch/update"
-    payload = [
-        {
-            "id": company_id,
-            "properties": _coerce_properties_to_hubspot(
-                dict(properties),
-                schema=schema,
-            ),
-        }
-        for company_id, properties in company_updates.items()
-    ]
-    async with httpx.AsyncClient(
-        transport=AsyncAugmentedTransport(actions_v0.authenticated_request_hubspot),
-    ) as client:
-        response = await client.post(url, json={"inputs": payload})
-        await raise_error_text(response)
-        await response.aread()
-        data = response.json()
-        return [result["id"] for result in data["results"]]
+
+    async with _hubspot_client() as client:
+        schema = await _get_hubspot_properties_schema(client, _COMPANIES_OBJECT_TYPE)
+        inputs = [
+            {
+                "id": company_id,
+                "properties": _coerce_properties_to_hubspot(
+                    properties,
+                    schema=schema,
+                ),
+            }
+            for company_id, properties in company_updates.items()
+        ]
+        return await _post_batch_inputs(client, url, inputs)
 
 
 @purpose("Search companies.")
 async def hubspot_search_companies(
     query: SearchQuery,
     pagination_token: Optional[HubSpotPaginationToken] = None,
+    properties: Optional[List[str]] = None,
 ) -> Tuple[List[HubSpotCompany], Optional[HubSpotPaginationToken]]:
-    """Search for HubSpot companies using OR-of-ANDs boolean logic."""
-    schema = await _get_hubspot_properties_schema(HubSpotObjectType("COMPANIES"))
+    """Search for HubSpot companies using OR-of-ANDs boolean logic.
 
-    if not query.or_groups:
-        return await _list_companies(schema, pagination_token)
+    If `properties` is given, only those properties (plus the ones needed to fill in
+    the HubSpotCompany fields) are fetched into `additional_properties`; otherwise
+    every company property is fetched.
+    """
+    url = "https://api.hubapi.com/crm/v3/objects/companies/search"
 
-    # Convert our filter structure to HubSpot's format
-    filter_groups = _convert_and_groups_to_filter_groups(query.or_groups, schema)
+    async with _hubspot_client() as client:
+        property_names = _get_requested_property_names(
+            _HUBSPOT_COMPANY_CORE_PROPERTIES, properties
+        )
 
-    url = "https://api.hubapi.com/crm/v3/objects/companies/search"
+        if not query.or_groups and property_names is not None:
+            # Listing explicit properties only needs the schema to parse the results, so
+            # fetch the schema and the page at the same time.
+            schema, data = await asyncio.gather(
+                _get_hubspot_properties_schema(client, _COMPANIES_OBJECT_TYPE),
+                _fetch_hubspot_objects_page(
+                    client,
+                    "companies",
+                    _encode_properties_query(property_names),
+                    pagination_token,
+                ),
+            )
+            return _parse_hubspot_companies_page(data, schema)
 
-    payload = {
-        "filterGroups": filter_groups,
-        "properties": _get_all_property_names(schema),
-    }
-    async with httpx.AsyncClient(
-        transport=AsyncAugmentedTransport(actions_v0.authenticated_request_hubspot),
-    ) as client:
-        response = await client.post(url, json=payload)
+        schema = await _get_hubspot_properties_schema(client, _COMPANIES_OBJECT_TYPE)
+
+        if not query.or_groups:
+            return await _list_companies(
+                client, schema, pagination_token, property_names
+            )
+
+        # Convert our filter structure to HubSpot's format
+        filter_groups = _convert_and_groups_to_filter_groups(query.or_groups, schema)
+
+        payload = {
+            "filterGroups": filter_groups,
+            "properties": (
+                _get_all_property_names(schema)
+                if property_names is None
+                else property_names
+            ),
+        }
+        response = await _maybe_retry_send(
+            client, client.build_request("POST", url, json=payload)
+        )
         await raise_error_text(response)
         await response.aread()
         data = response.json()
 
-    companies = [
-        _parse_hubspot_company(item, schema) for item in data.get("results") or []
-    ]
-    token = data.get("paging", {}).get("next", {}).get("after")
-    next_pagination_token = HubSpotPaginationToken(token=token) if token else None
-    return companies, next_pagination_token
+    return _parse_hubspot_companies_page(data, schema)
+
+
+@purpose("Fetch companies by ID.")
+async def hubspot_fetch_companies_by_ids(
+    company_ids: Sequence[str],
+    properties: Optional[List[str]] = None,
+) -> List[HubSpotCompany]:
+    """Fetch the HubSpot companies with the given IDs, in the order of `company_ids`.
+    IDs that do not match a company are skipped.
+
+    If `properties` is given, only those properties (plus the ones needed to fill in
+    the HubSpotCompany fields) are fetched into `additional_properties`; otherwise
+    every company property is fetched.
+
+    Use this instead of searching by `hs_object_id` when you already have the IDs, as it
+    fetches the companies in batches.
+    """
+    async with _hubspot_client() as client:
+        schema = await _get_hubspot_properties_schema(client, _COMPANIES_OBJECT_TYPE)
+        property_names = _get_requested_property_names(
+            _HUBSPOT_COMPANY_CORE_PROPERTIES, properties
+        )
+        results = await _batch_read_hubspot_objects(
+            client,
+            "companies",
+            company_ids,
+            (
+                _get_all_property_names(schema)
+                if property_names is None
+                else property_names
+            ),
+        )
+
+    return [_parse_hubspot_company(item, schema) for item in results]
 
 
-@dataclass
+@dataclass(slots=True)
 class HubSpotDeal:
     """The `additional_properties` field stores any additional properties that are
     available in the HubSpot deal system that callers can ask for.
@@ -832,55 +1297,58 @@ class HubSpotDeal:
     archived: bool
 
 
+# The deal properties that `HubSpotDeal` is built from.
+_HUBSPOT_DEAL_CORE_PROPERTIES = (
+    "dealname",
+    "dealstage",
+    "closedate",
+    "amount",
+    "hs_object_id",
+    "hs_lastmodifieddate",
+)
+
+
 def _parse_hubspot_deal(
     api_item: dict, schema: _HubSpotPropertiesSchema
 ) -> HubSpotDeal:
     properties = api_item.get("properties") or {}
+    get = properties.get
+    closedate = get("closedate")
     return HubSpotDeal(
         created_at=_get_datetime_with_fallback(api_item, "createdAt"),
         updated_at=_get_datetime_with_fallback(api_item, "updatedAt"),
         archived=api_item.get("archived") or False,
-        dealname=properties.get("dealname") or "",
-        dealstage=properties.get("dealstage") or "",
-        closedate=(
-            datetime.fromisoformat(properties["closedate"])
-            if properties.get("closedate")
-            else None
-        ),
-        amount=float(properties.get("amount") or 0),
-        hs_object_id=properties.get("hs_object_id") or "",
+        dealname=get("dealname") or "",
+        dealstage=get("dealstage") or "",
+        closedate=_parse_hubspot_datetime(closedate) if closedate else None,
+        amount=float(get("amount") or 0),
+        hs_object_id=get("hs_object_id") or "",
         last_modified_date=_get_datetime_with_fallback(
             properties, "hs_lastmodifieddate"
         ),
         additional_properties=_coerce_properties_to_lutra(
-            {key: val for key, val in properties.items() if val is not None},
+            properties,
             schema=schema,
         ),
     )
 
 
+def _parse_hubspot_deals_page(
+    data: Dict[str, Any], schema: _HubSpotPropertiesSchema
+) -> Tuple[List[HubSpotDeal], Optional[HubSpotPaginationToken]]:
+    deals = [_parse_hubspot_deal(item, schema) for item in data.get("results") or ()]
+    return deals, _get_next_pagination_token(data)
+
+
 async def _list_deals(
+    client: httpx.AsyncClient,
     schema: _HubSpotPropertiesSchema,
     pagination_token: Optional[HubSpotPaginationToken] = None,
 ) -> Tuple[List[HubSpotDeal], Optional[HubSpotPaginationToken]]:
-    url = "https://api.hubapi.com/crm/v3/objects/deals"
-    params = {"properties": _get_all_property_names(schema), "limit": 100}
-    if pagination_token:
-        params["after"] = pagination_token.token
-
-    async with httpx.AsyncClient(
-        transport=AsyncAugmentedTransport(actions_v0.authenticated_request_hubspot),
-    ) as client:
-        response = await client.get(url, params=params)
-        await raise_error_text(response)
-        await response.aread()
-        data = response.json()
-
-    deals = [_parse_hubspot_deal(item, schema) for item in data.get("results") or []]
-    token = data.get("paging", {}).get("next", {}).get("after")
-    next_pagination_token = HubSpotPaginationToken(token=token) if token else None
-
-    return deals, next_pagination_token
+    data = await _fetch_hubspot_objects_page(
+        client, "deals", schema.properties_query, pagination_token
+    )
+    return _parse_hubspot_deals_page(data, schema)
 
 
 @purpose("Create deals.")
@@ -899,10 +1367,9 @@ async def hubspot_create_deals(deals: Sequence[HubSpotDeal]) -> List[str]:
     """
     url = "https://api.hubapi.com/crm/v3/objects/deals/batch/create"
 
-    # Prepare the payload from the deals list
-    deal_payload = []
-    for deal in deals:
-        deal_data = {
+    # Prepare the inputs from the deals list
+    inputs = [
+        {
             "properties": {
                 "dealname": deal.dealname,
                 "dealstage": deal.dealstage,
@@ -910,19 +1377,11 @@ async def hubspot_create_deals(deals: Sequence[HubSpotDeal]) -> List[str]:
                 "amount": str(deal.amount),  # Assuming amount is a numeric field
             }
         }
-        deal_payload.append(deal_data)
-
-    payload = {"inputs": deal_payload}
-
-    async with httpx.AsyncClient(
-        transport=AsyncAugmentedTransport(actions_v0.authenticated_request_hubspot),
-    ) as client:
-        response = await client.post(url, json=payload)
-        await raise_error_text(response)
-        await response.aread()
-        data = response.json()
+        for deal in deals
+    ]
 
-    return [result["id"] for result in data["results"]]
+    async with _hubspot_client() as client:
+        return await _post_batch_inputs(client, url, inputs)
 
 
 @purpose("Update deals.")
@@ -976,26 +1435,21 @@ async def hubspot_update_deals(
     hs_is_closed: True if the deal was won or lost.
     hs_is_closed_won: True if the deal is in the closed-won state.
     """
-    schema = await _get_hubspot_properties_schema(HubSpotObjectType("DEALS"))
     url = "https://api.hubapi.com/crm/v3/objects/deals/batch/update"
-    payload = [
-        {
-            "id": deal_id,
-            "properties": _coerce_properties_to_hubspot(
-                dict(properties),
-                schema=schema,
-            ),
-        }
-        for deal_id, properties in deal_updates.items()
-    ]
-    async with httpx.AsyncClient(
-        transport=AsyncAugmentedTransport(actions_v0.authenticated_request_hubspot),
-    ) as client:
-        response = await client.post(url, json={"inputs": payload})
-        await raise_error_text(response)
-        await response.aread()
-        data = response.json()
-        return [result["id"] for result in data["results"]]
+
+    async with _hubspot_client() as client:
+        schema = await _get_hubspot_properties_schema(client, _DEALS_OBJECT_TYPE)
+        inputs = [
+            {
+                "id": deal_id,
+                "properties": _coerce_properties_to_hubspot(
+                    properties,
+                    schema=schema,
+                ),
+            }
+            for deal_id, properties in deal_updates.items()
+        ]
+        return await _post_batch_inputs(client, url, inputs)
 
 
 @purpose("Search deals.")
@@ -1004,55 +1458,122 @@ async def hubspot_search_deals(
     pagination_token: Optional[HubSpotPaginationToken] = None,
 ) -> Tuple[List[HubSpotDeal], Optional[HubSpotPaginationToken]]:
     """Search for HubSpot deals using OR-of-ANDs boolean logic."""
-    schema = await _get_hubspot_properties_schema(HubSpotObjectType("DEALS"))
-    if not query.or_groups:
-        return await _list_deals(schema, pagination_token)
+    url = "https://api.hubapi.com/crm/v3/objects/deals/search"
 
-    filter_groups = _convert_and_groups_to_filter_groups(query.or_groups, schema)
+    async with _hubspot_client() as client:
+        schema = await _get_hubspot_properties_schema(client, _DEALS_OBJECT_TYPE)
+        if not query.or_groups:
+            return await _list_deals(client, schema, pagination_token)
 
-    url = "https://api.hubapi.com/crm/v3/objects/deals/search"
+        filter_groups = _convert_and_groups_to_filter_groups(query.or_groups, schema)
 
-    payload = {
-        "filterGroups": filter_groups,
-        "properties": _get_all_property_names(schema),
-    }
+        payload = {
+            "filterGroups": filter_groups,
+            "properties": _get_all_property_names(schema),
+        }
 
-    async with httpx.AsyncClient(
-        transport=AsyncAugmentedTransport(actions_v0.authenticated_request_hubspot),
-    ) as client:
-        response = await client.post(url, json=payload)
+        response = await _maybe_retry_send(
+            client, client.build_request("POST", url, json=payload)
+        )
         await raise_error_text(response)
         await response.aread()
         data = response.json()
 
-    deals = [_parse_hubspot_deal(item, schema) for item in data.get("results") or []]
-    token = data.get("paging", {}).get("next", {}).get("after")
-    next_pagination_token = HubSpotPaginationToken(token=token) if token else None
-
-    return deals, next_pagination_token
-
-
-_HUBSPOT_OBJECT_TYPE_IDS = dict(
-    CONTACTS="0-1",
-    COMPANIES="0-2",
-    DEALS="0-3",
-    TICKETS="0-5",
-    CALLS="0-48",
-    EMAILS="0-49",
-    MEETINGS="0-47",
-    NOTES="0-4",
-    TASKS="0-27",
-    PRODUCTS="0-7",
-    INVOICES="0-52",
-    LINE_ITEMS="0-8",
-    PAYMENTS="0-101",
-    QUOTES="0-14",
-    SUBSCRIPTIONS="0-69",
-    COMMUNICATIONS="0-18",
-    POSTAL_MAIL="0-116",
-    MARKETING_EVENTS="0-54",
-    FEEDBACK_SUBMISSIONS="0-19",
-)
+    return _parse_hubspot_deals_page(data, schema)
+
+
+@purpose("Fetch deals by ID.")
+async def hubspot_fetch_deals_by_ids(
+    deal_ids: Sequence[str],
+    properties: Optional[List[str]] = None,
+) -> List[HubSpotDeal]:
+    """Fetch the HubSpot deals with the given IDs, in the order of `deal_ids`. IDs that
+    do not match a deal are skipped.
+
+    If `properties` is given, only those properties (plus the ones needed to fill in
+    the HubSpotDeal fields) are fetched into `additional_properties`; otherwise every
+    deal property is fetched.
+
+    Use this instead of searching by `hs_object_id` when you already have the IDs, as it
+    fetches the deals in batches.
+    """
+    async with _hubspot_client() as client:
+        schema = await _get_hubspot_properties_schema(client, _DEALS_OBJECT_TYPE)
+        property_names = _get_requested_property_names(
+            _HUBSPOT_DEAL_CORE_PROPERTIES, properties
+        )
+        results = await _batch_read_hubspot_objects(
+            client,
+            "deals",
+            deal_ids,
+            (
+                _get_all_property_names(schema)
+                if property_names is None
+                else property_names
+            ),
+        )
+
+    return [_parse_hubspot_deal(item, schema) for item in results]
+
+
+_HUBSPOT_OBJECT_TYPE_IDS = {
+    "CONTACTS": "0-1",
+    "COMPANIES": "0-2",
+    "DEALS": "0-3",
+    "TICKETS": "0-5",
+    "CALLS": "0-48",
+    "EMAILS": "0-49",
+    "MEETINGS": "0-47",
+    "NOTES": "0-4",
+    "TASKS": "0-27",
+    "PRODUCTS": "0-7",
+    "INVOICES": "0-52",
+    "LINE_ITEMS": "0-8",
+    "PAYMENTS": "0-101",
+    "QUOTES": "0-14",
+    "SUBSCRIPTIONS": "0-69",
+    "COMMUNICATIONS": "0-18",
+    "POSTAL_MAIL": "0-116",
+    "MARKETING_EVENTS": "0-54",
+    "FEEDBACK_SUBMISSIONS": "0-19",
+}
+
+
+def _get_hubspot_object_type_id(object_type: HubSpotObjectType) -> str:
+    return _HUBSPOT_OBJECT_TYPE_IDS[object_type.name]
+
+
+@functools.lru_cache(maxsize=64)
+def _associations_batch_url(
+    source_object_type: HubSpotObjectType,
+    target_object_type: HubSpotObjectType,
+    operation: Literal["read", "create"],
+) -> str:
+    source_type_name = _get_hubspot_object_type_id(source_object_type)
+    target_type_name = _get_hubspot_object_type_id(target_object_type)
+    return f"https://api.hubapi.com/crm/v4/associations/{source_type_name}/{target_type_name}/batch/{operation}"
+
+
+async def _fetch_associated_object_ids(
+    source_object_type: HubSpotObjectType,
+    target_object_type: HubSpotObjectType,
+    source_object_ids: Sequence[str],
+) -> Dict[str, List[str]]:
+    url = _associations_batch_url(source_object_type, target_object_type, "read")
+    associated_object_ids: Dict[str, List[str]] = {
+        source_object_id: [] for source_object_id in source_object_ids
+    }
+
+    async with _hubspot_client() as client:
+        results = await _post_batch_reads(client, url, source_object_ids)
+
+    for result in results:
+        associated_object_ids[str(result["from"]["id"])] = [
+            associated_object["toObjectId"]
+            for associated_object in result.get("to") or ()
+        ]
+
+    return associated_object_ids
 
 
 @purpose("Fetch associated object IDs.")
@@ -1066,26 +1587,29 @@ async def hubspot_fetch_associated_object_ids(
     using the HubSpot association API. You must use this to find HubSpot
     objects that are associated to each other.
     """
-    source_type_name = _HUBSPOT_OBJECT_TYPE_IDS[source_object_type.name]
-    target_type_name = _HUBSPOT_OBJECT_TYPE_IDS[target_object_type.name]
-    url = f"https://api.hubapi.com/crm/v4/associations/{source_type_name}/{target_type_name}/batch/read"
-    params = {"inputs": [{"id": source_object_id}]}
-
-    async with httpx.AsyncClient(
-        transport=AsyncAugmentedTransport(actions_v0.authenticated_request_hubspot)
-    ) as client:
-        response = await client.post(url, json=params)
-        await raise_error_text(response)
-        await response.aread()
-        data = response.json()
+    associated_object_ids = await _fetch_associated_object_ids(
+        source_object_type, target_object_type, [source_object_id]
+    )
+    return associated_object_ids[source_object_id]
 
-        if results := data.get("results", []):
-            return [
-                associated_object["toObjectId"]
-                for associated_object in results[0].get("to", [])
-            ]
 
-    return []
+@purpose("Fetch associated object IDs for many objects.")
+async def hubspot_fetch_associated_object_ids_batch(
+    source_object_type: HubSpotObjectType,
+    target_object_type: HubSpotObjectType,
+    source_object_ids: Sequence[str],
+) -> Dict[str, List[str]]:
+    """
+    Returns a mapping from each of the source object IDs to the IDs of target objects
+    associated with it, using the HubSpot association API. Source objects without
+    associations map to an empty list.
+
+    Use this instead of calling hubspot_fetch_associated_object_ids for each object
+    when you need the associations of many objects, as it fetches them in batches.
+    """
+    return await _fetch_associated_object_ids(
+        source_object_type, target_object_type, source_object_ids
+    )
 
 
 ASSOCIATION_TYPE_IDS = {
@@ -1099,7 +1623,7 @@ ASSOCIATION_TYPE_IDS = {
 }
 
 
-@dataclass
+@dataclass(slots=True)
 class HubSpotAssociationType:
     type: Literal[
         "CONTACT_TO_CONTACT",
@@ -1112,6 +1636,45 @@ class HubSpotAssociationType:
     ]
 
 
+async def _create_associations(
+    association_type: HubSpotAssociationType,
+    source_object_type: HubSpotObjectType,
+    target_object_type: HubSpotObjectType,
+    object_id_pairs: Sequence[Tuple[str, str]],
+):
+    url = _associations_batch_url(source_object_type, target_object_type, "create")
+    # Every input has the same association type, so they can share one `types` list.
+    types = [
+        {
+            "associationCategory": "HUBSPOT_DEFINED",
+            "associationTypeId": ASSOCIATION_TYPE_IDS[association_type.type],
+        }
+    ]
+
+    async with _hubspot_client() as client:
+        for start in range(0, len(object_id_pairs), _HUBSPOT_BATCH_SIZE):
+            params = {
+                "inputs": [
+                    {
+                        "types": types,
+                        "from": {
+                            "id": source_object_id,
+                        },
+                        "to": {
+                            "id": target_object_id,
+                        },
+                    }
+                    for source_object_id, target_object_id in object_id_pairs[
+                        start : start + _HUBSPOT_BATCH_SIZE
+                    ]
+                ]
+            }
+            response = await _maybe_retry_send(
+                client, client.build_request("POST", url, json=params)
+            )
+            await raise_error_text(response)
+
+
 @purpose("Create association between object IDs.")
 async def hubspot_create_association_between_object_ids(
     association_type: HubSpotAssociationType,
@@ -1123,35 +1686,32 @@ async def hubspot_create_association_between_object_ids(
     """
     Creates an association between the source and target objects in HubSpot.
     """
-    source_type_name = _HUBSPOT_OBJECT_TYPE_IDS[source_object_type.name]
-    target_type_name = _HUBSPOT_OBJECT_TYPE_IDS[target_object_type.name]
-    url = f"https://api.hubapi.com/crm/v4/associations/{source_type_name}/{target_type_name}/batch/create"
-    params = {
-        "inputs": [
-            {
-                "types": [
-                    {
-                        "associationCategory": "HUBSPOT_DEFINED",
-                        "associationTypeId": ASSOCIATION_TYPE_IDS.get(
-                            association_type.type
-                        ),
-                    }
-                ],
-                "from": {
-                    "id": source_object_id,
-                },
-                "to": {
-                    "id": target_object_id,
-                },
-            }
-        ]
-    }
+    await _create_associations(
+        association_type,
+        source_object_type,
+        target_object_type,
+        [(source_object_id, target_object_id)],
+    )
 
-    async with httpx.AsyncClient(
-        transport=AsyncAugmentedTransport(actions_v0.authenticated_request_hubspot)
-    ) as client:
-        response = await client.post(url, json=params)
-        await raise_error_text(response)
+
+@purpose("Create associations between many pairs of object IDs.")
+async def hubspot_create_associations_between_object_ids(
+    association_type: HubSpotAssociationType,
+    source_object_type: HubSpotObjectType,
+    target_object_type: HubSpotObjectType,
+    object_id_pairs: Sequence[Tuple[str, str]],
+):
+    """
+    Creates an association between the source and target objects of each
+    (source object ID, target object ID) pair in HubSpot.
+
+    Use this instead of calling hubspot_create_association_between_object_ids for each
+    pair when creating many associations of the same type, as it creates them in
+    batches.
+    """
+    await _create_associations(
+        association_type, source_object_type, target_object_type, object_id_pairs
+    )
 
 
 async def _merge_objects(url: str, primary_object_id: str, object_to_merge_id: str):
@@ -1159,10 +1719,10 @@ async def _merge_objects(url: str, primary_object_id: str, object_to_merge_id: s
         "objectIdToMerge": object_to_merge_id,
         "primaryObjectId": primary_object_id,
     }
-    async with httpx.AsyncClient(
-        transport=AsyncAugmentedTransport(actions_v0.authenticated_request_hubspot)
-    ) as client:
-        response = await client.post(url, json=params)
+    async with _hubspot_client() as client:
+        response = await _maybe_retry_send(
+            client, client.build_request("POST", url, json=params)
+        )
         await raise_error_text(response)
 
 
@@ -1180,35 +1740,51 @@ async def hubspot_merge_companies(primary_company_id: str, company_to_merge_id:
     await _merge_objects(url, primary_company_id, company_to_merge_id)
 
 
+async def _get_hubspot_list_id(
+    client: httpx.AsyncClient, object_type_id: str, list_name: str
+) -> Optional[str]:
+    """Returns the ID of the list with the given name, or None if there is none."""
+    escaped_list_name = urllib.parse.quote(list_name, safe="")
+    url = f"https://api.hubapi.com/crm/v3/lists/object-type-id/{object_type_id}/name/{escaped_list_name}"
+    response = await _maybe_retry_send(client, client.build_request("GET", url))
+    await response.aread()
+    await raise_error_text(response)
+    data = response.json()
+    if not (list_data := data.get("list")):
+        return None
+    return list_data["listId"]
+
+
 @purpose("Fetch HubSpot List.")
 async def hubspot_list_memberships(
-    list_name: str, object_type: HubSpotObjectType
+    list_name: str,
+    object_type: HubSpotObjectType,
+    pagination_token: Optional[HubSpotPaginationToken] = None,
+    list_id: Optional[str] = None,
 ) -> Tuple[List[str], Optional[HubSpotPaginationToken]]:
-    """Returns object_ids associated with the HubSpot List object."""
-    object_type_id = _HUBSPOT_OBJECT_TYPE_IDS[object_type.name]
-    escaped_list_name = urllib.parse.quote(list_name, safe="")
-    url = f"https://api.hubapi.com/crm/v3/lists/object-type-id/{object_type_id}/name/{escaped_list_name}"
+    """Returns object_ids associated with the HubSpot List object.
+
+    If `list_id` is given, the list with that ID is read and `list_name` is not looked
+    up, which saves a request per page when the ID is known.
+    """
     object_ids = []
     next_pagination_token = None
-    async with httpx.AsyncClient(
-        transport=AsyncAugmentedTransport(actions_v0.authenticated_request_hubspot)
-    ) as client:
-        response = await client.get(url)
-        await response.aread()
-        await raise_error_text(response)
-        data = response.json()
-        if list_data := data.get("list"):
-            list_id = list_data["listId"]
-            memberships_response = await client.get(
-                f"https://api.hubapi.com/crm/v3/lists/{list_id}/memberships"
+    async with _hubspot_client() as client:
+        if list_id is None:
+            list_id = await _get_hubspot_list_id(
+                client, _get_hubspot_object_type_id(object_type), list_name
+            )
+        if list_id:
+            url = f"https://api.hubapi.com/crm/v3/lists/{list_id}/memberships"
+            if pagination_token:
+                url += "?" + urllib.parse.urlencode({"after": pagination_token.token})
+            memberships_response = await _maybe_retry_send(
+                client, client.build_request("GET", url)
             )
             await raise_error_text(memberships_response)
             await memberships_response.aread()
             membership_data = memberships_response.json()
-            token = data.get("paging", {}).get("next", {}).get("after")
-            next_pagination_token = (
-                HubSpotPaginationToken(token=token) if token else None
-            )
+            next_pagination_token = _get_next_pagination_token(membership_data)
             if results := membership_data.get("results"):
                 object_ids = [result.get("recordId") for result in results]
     return object_ids, next_pagination_token
@@ -0,0 +1,435 @@
+"""Tests for the hubspot plugin.
+
+These tests send requests to mock transports, so they do not need a HubSpot account
+or an internet connection.
+"""
+
+import asyncio
+import email.utils
+import json
+import time
+import types
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import httpx
+import plugin
+
+# Create a module that has a symbol called authenticated_request_hubspot
+actions_v0 = types.ModuleType("actions_v0")
+setattr(actions_v0, "authenticated_request_hubspot", lambda: None)
+plugin.__dict__["actions_v0"] = actions_v0
+
+
+def _mock_httpx_async_client(handler):
+    """Returns an httpx.AsyncClient class that sends requests to handler, not the
+    network.
+    """
+
+    class MockHttpxAsyncClient(httpx.AsyncClient):
+        def __init__(self, *args, **kwargs):
+            kwargs["transport"] = httpx.MockTransport(handler)
+            super().__init__(*args, **kwargs)
+
+    return MockHttpxAsyncClient
+
+
+def _properties_schema_json(*names):
+    return {"results": [{"name": name, "type": "string"} for name in names]}
+
+
+_DEALS_SCHEMA = plugin._HubSpotPropertiesSchema(
+    properties={
+        "dealname": {"name": "dealname", "type": "string"},
+        "closedate": {"name": "closedate", "type": "datetime"},
+        "amount": {"name": "amount", "type": "number"},
+    }
+)
+
+
+class TestPlugin(unittest.TestCase):
+    def test_parse_hubspot_deal_closedate(self):
+        deal = plugin._parse_hubspot_deal(
+            {
+                "id": "1",
+                "properties": {
+                    "dealname": "Deal",
+                    "closedate": "2024-03-01T12:00:00Z",
+                    "amount": "100.5",
+                },
+                "createdAt": "2024-01-01T00:00:00Z",
+                "updatedAt": "2024-02-01T00:00:00Z",
+                "archived": False,
+            },
+            _DEALS_SCHEMA,
+        )
+        self.assertEqual(deal.closedate, datetime(2024, 3, 1, 12, tzinfo=timezone.utc))
+        self.assertEqual(deal.amount, 100.5)
+
+    def test_parse_hubspot_deal_without_closedate(self):
+        for properties in (
+            {"dealname": "Deal"},
+            {"closedate": ""},
+            {"closedate": None},
+        ):
+            deal = plugin._parse_hubspot_deal(
+                {"id": "1", "properties": properties}, _DEALS_SCHEMA
+            )
+            self.assertIsNone(deal.closedate)
+            self.assertEqual(deal.created_at, datetime(1970, 1, 1, tzinfo=timezone.utc))
+
+    def test_properties_schemas_are_not_shared_between_accounts(self):
+        def account_handler(property_name, requests):
+            def handler(request):
+                requests.append(request)
+                if request.url.path.startswith("/crm/v3/properties/"):
+                    return httpx.Response(
+                        200, json=_properties_schema_json(property_name)
+                    )
+                return httpx.Response(200, json={"results": []})
+
+            return handler
+
+        empty_query = plugin.SearchQuery(or_groups=[])
+        for property_name in ("account_a_property", "account_b_property"):
+            requests = []
+            with patch(
+                "plugin.httpx.AsyncClient",
+                new=_mock_httpx_async_client(account_handler(property_name, requests)),
+            ):
+                asyncio.run(plugin.hubspot_search_deals(empty_query))
+            # Each account's schema is fetched with its own credentials, and used to
+            # choose the properties to list.
+            self.assertEqual(
+                [request.url.path for request in requests],
+                ["/crm/v3/properties/DEALS", "/crm/v3/objects/deals"],
+            )
+            self.assertEqual(
+                requests[1].url.params.get_list("properties"), [property_name]
+            )
+
+    def test_fetch_associated_object_ids_batch_with_repeated_ids(self):
+        input_ids = []
+
+        def handler(request):
+            inputs = json.loads(request.content)["inputs"]
+            input_ids.extend(input["id"] for input in inputs)
+            return httpx.Response(
+                200,
+                json={
+                    "results": [
+                        {
+                            "from": {"id": input["id"]},
+                            "to": [{"toObjectId": f"deal-{input['id']}"}],
+                        }
+                        for input in inputs
+                    ]
+                },
+            )
+
+        with patch("plugin.httpx.AsyncClient", new=_mock_httpx_async_client(handler)):
+            result = asyncio.run(
+                plugin.hubspot_fetch_associated_object_ids_batch(
+                    plugin._CONTACTS_OBJECT_TYPE,
+                    plugin._DEALS_OBJECT_TYPE,
+                    ["1", "2", "1"],
+                )
+            )
+        self.assertEqual(input_ids, ["1", "2"])
+        self.assertEqual(result, {"1": ["deal-1"], "2": ["deal-2"]})
+
+    def _send(self, handler, method):
+        async def send():
+            async with plugin._hubspot_client() as client:
+                return await plugin._maybe_retry_send(
+                    client,
+                    client.build_request(
+                        method, "https://api.hubapi.com/crm/v3/objects/deals"
+                    ),
+                )
+
+        with patch("plugin.httpx.AsyncClient", new=_mock_httpx_async_client(handler)):
+            return asyncio.run(send())
+
+    def _failing_once_handler(self, requests, status_code):
+        def handler(request):
+            requests.append(request)
+            if len(requests) == 1:
+                return httpx.Response(status_code, headers={"retry-after": "0"})
+            return httpx.Response(200, json={})
+
+        return handler
+
+    def test_retries_when_rate_limited(self):
+        requests = []
+        response = self._send(self._failing_once_handler(requests, 429), "POST")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(requests), 2)
+
+    def test_retries_read_only_request_when_unavailable(self):
+        requests = []
+        response = self._send(self._failing_once_handler(requests, 503), "GET")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(requests), 2)
+
+    def test_does_not_retry_modifying_request_when_unavailable(self):
+        requests = []
+        response = self._send(self._failing_once_handler(requests, 503), "POST")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(len(requests), 1)
+
+    def test_does_not_report_long_unavailable_waits_as_rate_limits(self):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(503, headers={"retry-after": "3600"})
+
+        response = self._send(handler, "GET")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(len(requests), 1)
+
+    def test_requested_wait_seconds_with_http_date_retry_after(self):
+        retry_after = email.utils.formatdate(time.time() + 20, usegmt=True)
+        response = httpx.Response(429, headers={"retry-after": retry_after})
+        self.assertAlmostEqual(
+            plugin._get_requested_wait_seconds(response), 20.0, delta=2.0
+        )
+        # Dates in the past mean retrying right away.
+        response = httpx.Response(
+            429, headers={"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}
+        )
+        self.assertEqual(plugin._get_requested_wait_seconds(response), 0.0)
+
+    def test_reports_long_rate_limit_waits(self):
+        for headers in (
+            {"retry-after": "3600"},
+            {"retry-after": email.utils.formatdate(time.time() + 3600, usegmt=True)},
+            {
+                "x-hubspot-ratelimit-remaining": "0",
+                "x-hubspot-ratelimit-interval-milliseconds": "86400000",
+            },
+        ):
+            requests = []
+
+            def handler(request):
+                requests.append(request)
+                return httpx.Response(429, headers=headers)
+
+            with self.assertRaisesRegex(RuntimeError, "rate limit exceeded"):
+                self._send(handler, "GET")
+            self.assertEqual(len(requests), 1)
+
+    def _list_memberships_handler(self, list_id, requests):
+        def handler(request):
+            requests.append(request)
+            if request.url.path.startswith("/crm/v3/lists/object-type-id/"):
+                return httpx.Response(200, json={"list": {"listId": list_id}})
+            after = request.url.params.get("after")
+            if after is None:
+                return httpx.Response(
+                    200,
+                    json={
+                        "results": [{"recordId": "1"}, {"recordId": "2"}],
+                        "paging": {"next": {"after": "cursor-1"}},
+                    },
+                )
+            self.assertEqual(after, "cursor-1")
+            return httpx.Response(200, json={"results": [{"recordId": "3"}]})
+
+        return handler
+
+    def test_list_memberships_pages(self):
+        requests = []
+        with patch(
+            "plugin.httpx.AsyncClient",
+            new=_mock_httpx_async_client(self._list_memberships_handler("7", requests)),
+        ):
+            first_page = asyncio.run(
+                plugin.hubspot_list_memberships(
+                    "Newsletter", plugin._CONTACTS_OBJECT_TYPE
+                )
+            )
+            object_ids, pagination_token = first_page
+            self.assertEqual(object_ids, ["1", "2"])
+            self.assertEqual(
+                pagination_token, plugin.HubSpotPaginationToken(token="cursor-1")
+            )
+            second_page = asyncio.run(
+                plugin.hubspot_list_memberships(
+                    "Newsletter", plugin._CONTACTS_OBJECT_TYPE, pagination_token
+                )
+            )
+        self.assertEqual(second_page, (["3"], None))
+        self.assertEqual(
+            [
+                request.url.path
+                for request in requests
+                if "memberships" in request.url.path
+            ],
+            ["/crm/v3/lists/7/memberships", "/crm/v3/lists/7/memberships"],
+        )
+
+    def test_list_memberships_with_list_id(self):
+        requests = []
+        with patch(
+            "plugin.httpx.AsyncClient",
+            new=_mock_httpx_async_client(self._list_memberships_handler("7", requests)),
+        ):
+            result = asyncio.run(
+                plugin.hubspot_list_memberships(
+                    "Newsletter",
+                    plugin._CONTACTS_OBJECT_TYPE,
+                    plugin.HubSpotPaginationToken(token="cursor-1"),
+                    list_id="7",
+                )
+            )
+        self.assertEqual(result, (["3"], None))
+        # The list name is not resolved when the list ID is given.
+        self.assertEqual(
+            [request.url.path for request in requests],
+            ["/crm/v3/lists/7/memberships"],
+        )
+
+    def test_list_ids_are_not_shared_between_accounts(self):
+        for list_id in ("7", "8"):
+            requests = []
+            with patch(
+                "plugin.httpx.AsyncClient",
+                new=_mock_httpx_async_client(
+                    self._list_memberships_handler(list_id, requests)
+                ),
+            ):
+                asyncio.run(
+                    plugin.hubspot_list_memberships(
+                        "Newsletter", plugin._CONTACTS_OBJECT_TYPE
+                    )
+                )
+            # Each account resolves the list name to its own list.
+            self.assertEqual(
+                [request.url.path for request in requests],
+                [
+                    "/crm/v3/lists/object-type-id/0-1/name/Newsletter",
+                    f"/crm/v3/lists/{list_id}/memberships",
+                ],
+            )
+
+    def test_coerce_properties_to_hubspot_input_shapes(self):
+        # Two-character names would be split into a name and value if a mapping were
+        # iterated as pairs.
+        expected = {"ab": "1", "amount": "2.5"}
+        for properties in (
+            {"ab": 1, "amount": 2.5},
+            [("ab", 1), ("amount", 2.5)],
+            (("ab", 1), ("amount", plugin.HubSpotPropertyValue(2.5))),
+        ):
+            self.assertEqual(
+                plugin._coerce_properties_to_hubspot(properties, _DEALS_SCHEMA),
+                expected,
+            )
+
+    def test_update_deals_input_shapes(self):
+        for deal_updates in (
+            {"1": {"dealname": "Deal", "ab": "x"}},
+            {"1": [("dealname", "Deal"), ("ab", "x")]},
+        ):
+            bodies = []
+
+            def handler(request):
+                if request.url.path.startswith("/crm/v3/properties/"):
+                    return httpx.Response(200, json=_properties_schema_json("dealname"))
+                bodies.append(json.loads(request.content))
+                return httpx.Response(200, json={"results": [{"id": "1"}]})
+
+            with patch(
+                "plugin.httpx.AsyncClient", new=_mock_httpx_async_client(handler)
+            ):
+                result = asyncio.run(plugin.hubspot_update_deals(deal_updates))
+            self.assertEqual(result, ["1"])
+            self.assertEqual(
+                bodies,
+                [
+                    {
+                        "inputs": [
+                            {
+                                "id": "1",
+                                "properties": {"dealname": "Deal", "ab": "x"},
+                            }
+                        ]
+                    }
+                ],
+            )
+
+    def _batch_read_handler(self, batch_reads, missing_id):
+        def handler(request):
+            if request.url.path.startswith("/crm/v3/properties/"):
+                return httpx.Response(
+                    200, json=_properties_schema_json("dealname", "name", "extra")
+                )
+            payload = json.loads(request.content)
+            batch_reads.append(payload)
+            ids = [input["id"] for input in payload["inputs"]]
+            # HubSpot does not promise to return results in the order of the inputs.
+            return httpx.Response(
+                200,
+                json={
+                    "results": [
+                        {
+                            "id": object_id,
+                            "properties": {
+                                "dealname": f"Deal {object_id}",
+                                "name": f"Company {object_id}",
+                            },
+                        }
+                        for object_id in reversed(ids)
+                        if object_id != missing_id
+                    ]
+                },
+            )
+
+        return handler
+
+    def test_fetch_deals_by_ids(self):
+        batch_reads = []
+        deal_ids = [str(i) for i in range(150, 0, -1)] + ["7", "150"]
+        with patch(
+            "plugin.httpx.AsyncClient",
+            new=_mock_httpx_async_client(self._batch_read_handler(batch_reads, "3")),
+        ):
+            deals = asyncio.run(
+                plugin.hubspot_fetch_deals_by_ids(deal_ids, properties=["extra"])
+            )
+        # In the order of the IDs, without the missing deal or repeats.
+        self.assertEqual(
+            [deal.dealname for deal in deals],
+            [f"Deal {i}" for i in range(150, 0, -1) if i != 3],
+        )
+        # Each ID is sent once, in batches of at most 100.
+        self.assertEqual([len(payload["inputs"]) for payload in batch_reads], [100, 50])
+        self.assertEqual(
+            batch_reads[0]["properties"],
+            [*plugin._HUBSPOT_DEAL_CORE_PROPERTIES, "extra"],
+        )
+
+    def test_fetch_companies_by_ids(self):
+        batch_reads = []
+        with patch(
+            "plugin.httpx.AsyncClient",
+            new=_mock_httpx_async_client(self._batch_read_handler(batch_reads, "2")),
+        ):
+            companies = asyncio.run(
+                plugin.hubspot_fetch_companies_by_ids(["3", "2", "1", "3"])
+            )
+        self.assertEqual(
+            [company.name for company in companies], ["Company 3", "Company 1"]
+        )
+        self.assertEqual(
+            [input["id"] for input in batch_reads[0]["inputs"]], ["3", "2", "1"]
+        )
+        # Without `properties`, every property in the schema is fetched.
+        self.assertEqual(batch_reads[0]["properties"], ["dealname", "name", "extra"])
+
+
+if __name__ == "__main__":
+    unittest.main()